@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+'''
+Mede a taxa de desenho de cada classe de superfície com e sem o otimizador de modo de desenho.
+
+Uso, a partir da raiz do projeto: python -m benchmarks.blit_modes
+'''
+
+import os
+from time import perf_counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Roda sem abrir uma janela
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from source.file_system import AssetContainer
+from source.graphics import BlitModeOptimizer
+
+
+class BlitBenchmark():
+
+    '''
+    Compara o desenho das superfícies como foram criadas com o desenho das superfícies preparadas.
+    '''
+
+    display: pygame.Surface  # Superfície de destino
+    samples: dict  # Pares de superfície original e preparada por classe
+    iterations: int  # Desenhos por medição
+
+    def __init__(self, iterations=2000):
+
+        pygame.init()
+
+        self.display = pygame.display.set_mode((1024, 768))
+        self.iterations = iterations
+        self.samples = {}
+
+        asset_container = AssetContainer()
+
+        # Sprites escalados como no jogo. Cada um é classificado pelo canal alfa
+        for directory in ("planes", "scenery", "bullets", "animations"):
+
+            for image in self.get_images(asset_container.get_sprite(directory)):
+
+                size = (image.get_width() * 3, image.get_height() * 3)
+                self.add_sample(pygame.transform.scale(image, size))
+
+        # Retângulos coloridos da interface, criados sem conversão
+        rect_surface = pygame.Surface((300, 100))
+        rect_surface.fill((255, 255, 255))
+        self.add_sample(rect_surface, "UI rect")
+
+        # Tela cheia da interface, criada com transparência por pixel
+        screen_surface = pygame.Surface(self.display.get_size(), pygame.SRCALPHA)
+        screen_surface.fill((92, 184, 230))
+        self.add_sample(screen_surface, "UI screen")
+
+    @staticmethod
+    def get_images(directory):
+        '''
+        Retorna as imagens de um diretório de assets, incluindo os subdiretórios. As referências
+        do diretório são carregadas aqui.
+        '''
+
+        images = []
+
+        for asset in directory.values():
+
+            if isinstance(asset, dict):
+
+                images += BlitBenchmark.get_images(asset)
+            else:
+
+                images.append(asset.get())
+
+        return images
+
+    def add_sample(self, surface, name=None):
+        '''
+        Adiciona uma superfície na classe do seu modo de desenho.
+        '''
+
+        if name is None:
+
+            name = BlitModeOptimizer.classify(surface).name
+
+        self.samples.setdefault(name, []).append((surface, BlitModeOptimizer.prepare(surface)))
+
+    def measure(self, surfaces, rounds=5):
+        '''
+        Retorna os desenhos por segundo de uma lista de superfícies. Usa a melhor de algumas
+        rodadas, o que descarta o aquecimento e as interrupções do sistema.
+        '''
+
+        best_rate = 0.0
+
+        for _ in range(rounds):
+
+            start_time = perf_counter()
+
+            for i in range(self.iterations):
+
+                self.display.blit(surfaces[i % len(surfaces)], (0, 0))
+
+            best_rate = max(best_rate, self.iterations / (perf_counter() - start_time))
+
+        return best_rate
+
+    def run(self):
+        '''
+        Mede e mostra os resultados.
+        '''
+
+        print(f"{'Class':<12}{'Surfaces':>10}{'Original/s':>14}{'Prepared/s':>14}{'Gain':>8}")
+
+        for name, pairs in self.samples.items():
+
+            original_rate = self.measure([original for original, _ in pairs])
+            prepared_rate = self.measure([prepared for _, prepared in pairs])
+
+            print(f"{name:<12}{len(pairs):>10}{original_rate:>14.0f}{prepared_rate:>14.0f}"
+                  f"{prepared_rate / original_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+
+    BlitBenchmark().run()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+'''
+Compara o desenho das balas sprite por sprite com o desenho em lote.
+
+Uso, a partir da raiz do projeto: python -m benchmarks.bullet_batch
+'''
+
+import os
+from random import randint
+from time import perf_counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Roda sem abrir uma janela
+
+import pygame
+
+from source.graphics import CulledLayeredUpdates, CustomSprite, SpriteBatch
+
+
+class BulletBenchmark():
+
+    '''
+    Mede o tempo de desenho de um frame para várias quantidades de balas.
+    '''
+
+    display: pygame.Surface  # Superfície de destino
+    image: pygame.Surface  # Imagem da bala
+    frames: int  # Frames por medição
+
+    def __init__(self, frames=50):
+
+        pygame.init()
+
+        self.display = pygame.display.set_mode((1024, 768))
+        self.image = pygame.image.load(os.path.join("assets", "sprites", "bullets", "Bullet.png"))
+        self.image = self.image.convert_alpha()
+        self.frames = frames
+
+    def create_group(self, bullet_count, batched, track_rects=True):
+        '''
+        Cria as camadas de renderização com as balas em posições aleatórias.
+        '''
+
+        group = CulledLayeredUpdates(self.display.get_rect())
+
+        if batched:
+
+            group.set_batch(1, SpriteBatch())
+            group.set_rect_tracking(track_rects)
+
+        for _ in range(bullet_count):
+
+            group.add(CustomSprite((randint(0, 1024), randint(0, 768)), (3, 9), self.image), layer=1)
+
+        return group
+
+    def measure(self, group):
+        '''
+        Retorna o tempo médio de desenho de um frame em milissegundos.
+        '''
+
+        group.draw(self.display)  # Aquecimento
+
+        start_time = perf_counter()
+
+        for _ in range(self.frames):
+
+            group.draw(self.display)
+
+        return (perf_counter() - start_time) / self.frames * 1000.0
+
+    def run(self):
+        '''
+        Mede e mostra os resultados. O lote é medido com e sem o cálculo das regiões alteradas.
+        '''
+
+        print(f"{'Bullets':>8}{'Sprites ms':>12}{'Batch ms':>10}{'No rects ms':>13}")
+
+        for bullet_count in (100, 1000, 10000, 50000):
+
+            sprite_time = self.measure(self.create_group(bullet_count, False))
+            batch_time = self.measure(self.create_group(bullet_count, True))
+            untracked_time = self.measure(self.create_group(bullet_count, True, False))
+
+            print(f"{bullet_count:>8}{sprite_time:>12.3f}{batch_time:>10.3f}{untracked_time:>13.3f}")
+
+
+if __name__ == "__main__":
+
+    BulletBenchmark().run()
@@ -4,16 +4,18 @@
 Módulo para as entidades.
 '''
 
-from random import choice, randint
+from random import choice, randint, random
 from enum import Enum
 from math import sqrt
 
 import pygame
 from source.file_system import AssetContainer
 
-from source.graphics import CustomSprite, CustomAnimatedSprite
+from source.graphics import (CustomSprite, CustomAnimatedSprite, Layer, CulledLayeredUpdates,
+                             ParallaxCompositor, SpriteBatch)
 from source.physics import Hitbox
 from source.states import Event, State
+from source.waves import FlightPath, WaveFactory
 
 
 class EntityManager():
@@ -30,16 +32,29 @@ class EntityManager():
     bullets: list  # Balas
     clouds: list  # Nuvems
     animations: list  # Animações
+    render_group: CulledLayeredUpdates  # Camadas de renderização
+    background: ParallaxCompositor  # Plano de fundo composto. None quando as nuvens são sprites
     inactive_bullets: list  # Lista de balas inativas
     inactive_bullets_limit: int  # Limite de balas inativas
     enemies_limit: int  # Limite de inimigos
     small_animation_limit: int  # Limite de animações pequenas
+    effect_density: float  # Fração dos danos que geram uma explosão pequena
+    cloud_count: int  # Quantidade de nuvens
+    pending_cloud_count: int  # Quantidade de nuvens aplicada no próximo reinício
+    background_color: tuple  # Cor do céu. None quando as nuvens são sprites
     enemy_factory: None  # Fábrica de inimigos
+    wave_factory: WaveFactory  # Fábrica de ondas
     animation_factory: None  # Fábrica de animações
     elapsed_time: float  # Tempo passado
     event: Event  # Eventos
 
-    def __init__(self, screen_size, inactive_bullets_limit, enemies_limit, small_animation_limit, asset_container):
+    def __init__(self,
+                 screen_size,
+                 inactive_bullets_limit,
+                 enemies_limit,
+                 small_animation_limit,
+                 asset_container,
+                 background_color=None):
 
         self.score = 0
         self.screen_size = screen_size
@@ -70,10 +85,17 @@ class EntityManager():
         self.bullets = []
         self.clouds = []
         self.animations = []
+        self.render_group = CulledLayeredUpdates((0, 0, self.screen_size[0], self.screen_size[1]))
+        self.render_group.set_batch(Layer.BULLETS.value, SpriteBatch())  # As balas são desenhadas em lote
+        self.render_group.add(self.player.get_sprite(), layer=Layer.PLAYER.value)
         self.inactive_bullets = []
         self.inactive_bullets_limit = inactive_bullets_limit
         self.enemies_limit = enemies_limit
         self.small_animation_limit = small_animation_limit
+        self.effect_density = 1.0
+        self.cloud_count = 10
+        self.pending_cloud_count = self.cloud_count
+        self.background_color = background_color
         self.enemy_factory = EnemyFactory(self.screen_size,
                                           300.0,
                                           1.0,
@@ -82,11 +104,13 @@ class EntityManager():
                                           180,
                                           self.asset_container.get_audio("SFX", "Damage.wav"),
                                           self.asset_container)
-        self.animation_factory = AnimationFactory((300, 300), self.asset_container)
+        self.wave_factory = WaveFactory(self.screen_size, 20.0, self.enemy_factory)
+        self.animation_factory = AnimationFactory((300, 300), 75.0, self.asset_container)
         self.elapsed_time = 0.0
         self.event = None
+        self.background = None
 
-        self.generate_clouds(10)  # Gera as nuvens
+        self.generate_clouds(self.cloud_count, background_color)  # Gera as nuvens
 
     def update_player_modifiers(self, modifiers):
         '''
@@ -109,26 +133,105 @@ class EntityManager():
 
         return self.score
 
-    def get_entities(self, physics_entities):
+    def get_entities(self):
+        '''
+        Retorna as entidades para a física. O dicionário deixa a classificação das entidades mais
+        fácil no processamento da física. Os gráficos usam as camadas de renderização.
+        '''
+
+        return {"Clouds": self.clouds,
+                "Bullets": self.bullets,
+                "Enemies": self.enemies,
+                "Player": self.player}
+
+    def get_render_group(self):
+        '''
+        Retorna as camadas de renderização com os sprites das entidades ativas.
+        '''
+
+        return self.render_group
+
+    def get_background(self):
+        '''
+        Retorna o plano de fundo composto.
+        '''
+
+        return self.background
+
+    def set_small_animation_limit(self, small_animation_limit):
+        '''
+        Define o limite de animações pequenas.
+        '''
+
+        self.small_animation_limit = small_animation_limit
+
+    def set_effect_density(self, effect_density):
+        '''
+        Define a fração dos danos que geram uma explosão pequena.
+        '''
+
+        self.effect_density = effect_density
+
+    def set_cloud_count(self, cloud_count):
+        '''
+        Define a quantidade de nuvens. A mudança só é aplicada no próximo reinício, assim o ajuste
+        da qualidade durante o gameplay não trava o frame nem faz as nuvens saltarem.
         '''
-        Retorna uma lista de entidades.
+
+        self.pending_cloud_count = cloud_count
+
+    def apply_cloud_count(self):
         '''
+        Gera as nuvens novamente caso a quantidade tenha mudado.
+        '''
+
+        if self.pending_cloud_count == self.cloud_count:
+
+            return
 
-        # No caso de entidades para a física retorna um dicionário. Isso deixa a classificação
-        # de entidades mais fácil no processamento da física
-        if physics_entities:
+        for cloud in self.clouds:
 
-            return {"Clouds": self.clouds,
-                    "Bullets": self.bullets,
-                    "Enemies": self.enemies,
-                    "Player": self.player}
-        else:  # Retorna todas as entidades para o processamento gráfico
+            cloud.get_sprite().kill()
 
-            return self.clouds + self.bullets + self.enemies + [self.player] + self.animations
+        self.clouds.clear()
+        self.cloud_count = self.pending_cloud_count
+        self.generate_clouds(self.cloud_count, self.background_color)
 
-    def generate_clouds(self, cloud_count):
+    def resize(self, screen_size):
         '''
-        Gera as nuvens.
+        Ajusta as entidades a um novo tamanho de tela. As entidades, sprites e nuvens existentes são
+        mantidos, apenas os limites, as trajetórias e o plano de fundo composto mudam.
+        '''
+
+        self.screen_size = screen_size
+        self.render_group.set_viewport((0, 0, screen_size[0], screen_size[1]))
+        self.enemy_factory.set_screen_size(screen_size)
+        self.wave_factory.set_screen_size(screen_size)
+
+        if self.background is not None:
+
+            self.background.resize(screen_size)
+
+    def add_entity(self, entity_list, entity, layer):
+        '''
+        Adiciona uma entidade na lista e o seu sprite na camada de renderização.
+        '''
+
+        entity_list.append(entity)
+        self.render_group.add(entity.get_sprite(), layer=layer.value)
+
+    def remove_entity(self, entity_list, entity):
+        '''
+        Remove uma entidade da lista e o seu sprite das camadas de renderização.
+        '''
+
+        entity_list.remove(entity)
+        entity.get_sprite().kill()
+
+    def generate_clouds(self, cloud_count, background_color=None):
+        '''
+        Gera as nuvens. Com a cor do céu as nuvens são desenhadas pelo compositor do plano de fundo,
+        no lugar de serem entidades.
         '''
 
         for _ in range(cloud_count):  # Loop com base na quantidade de nuvens
@@ -157,6 +260,22 @@ class EntityManager():
             # menores
             self.clouds.sort(key=lambda cloud: cloud.size[0], reverse=True)
 
+        if background_color is not None:
+
+            # As nuvens têm velocidade constante, então podem ser pré-renderizadas
+            self.background = ParallaxCompositor(self.screen_size,
+                                                 background_color,
+                                                 [(cloud.get_sprite().image,
+                                                   cloud.get_sprite().rect.topleft,
+                                                   cloud.get_velocity()[1]) for cloud in self.clouds])
+            self.clouds.clear()
+            return
+
+        # Adiciona as nuvens na camada já na ordem correta
+        for cloud in self.clouds:
+
+            self.render_group.add(cloud.get_sprite(), layer=Layer.CLOUDS.value)
+
     def generate_shot(self, position, bullet_type, friendly, damage):
         '''
         Gera o tiro.
@@ -183,7 +302,7 @@ class EntityManager():
 
                 bullet = self.inactive_bullets[0]
                 bullet.shoot((position[0], position[1]), (0.0, velocity), friendly, damage)
-                self.bullets.append(bullet)
+                self.add_entity(self.bullets, bullet, Layer.BULLETS)
                 self.inactive_bullets.remove(bullet)
             else:  # Cria uma bala nova caso não haja nenhuma disponível
 
@@ -196,7 +315,7 @@ class EntityManager():
                                 friendly,
                                 damage)
                 bullet.shoot((position[0], position[1]), (0.0, velocity), friendly, damage)
-                self.bullets.append(bullet)
+                self.add_entity(self.bullets, bullet, Layer.BULLETS)
         elif bullet_type == BulletType.DOUBLE:  # Tiro duplo
 
             # Posições laterais das balas, com um espaçamento de 60 pixels entre elas
@@ -222,10 +341,10 @@ class EntityManager():
                                    friendly,
                                    damage)
 
-                self.bullets.append(bullet_left)
+                self.add_entity(self.bullets, bullet_left, Layer.BULLETS)
                 self.inactive_bullets.remove(bullet_left)
 
-                self.bullets.append(bullet_right)
+                self.add_entity(self.bullets, bullet_right, Layer.BULLETS)
                 self.inactive_bullets.remove(bullet_right)
             else:  # Cria novas balas
 
@@ -255,8 +374,8 @@ class EntityManager():
                                    friendly,
                                    damage)
 
-                self.bullets.append(bullet_left)
-                self.bullets.append(bullet_right)
+                self.add_entity(self.bullets, bullet_left, Layer.BULLETS)
+                self.add_entity(self.bullets, bullet_right, Layer.BULLETS)
         elif bullet_type == BulletType.TRIPLE:  # Tiro triplo
 
             # Posições laterais das balas, com um espaçamento de 60 pixels entre elas.
@@ -289,13 +408,13 @@ class EntityManager():
                                    friendly,
                                    damage)
 
-                self.bullets.append(bullet_left)
+                self.add_entity(self.bullets, bullet_left, Layer.BULLETS)
                 self.inactive_bullets.remove(bullet_left)
 
-                self.bullets.append(bullet_center)
+                self.add_entity(self.bullets, bullet_center, Layer.BULLETS)
                 self.inactive_bullets.remove(bullet_center)
 
-                self.bullets.append(bullet_right)
+                self.add_entity(self.bullets, bullet_right, Layer.BULLETS)
                 self.inactive_bullets.remove(bullet_right)
             else:  # Cria novas balas
 
@@ -337,9 +456,9 @@ class EntityManager():
                                    friendly,
                                    damage)
 
-                self.bullets.append(bullet_left)
-                self.bullets.append(bullet_center)
-                self.bullets.append(bullet_right)
+                self.add_entity(self.bullets, bullet_left, Layer.BULLETS)
+                self.add_entity(self.bullets, bullet_center, Layer.BULLETS)
+                self.add_entity(self.bullets, bullet_right, Layer.BULLETS)
         else:  # Tiro triplo em ângulo
 
             # Define as três balas, atira cada uma e as adiciona na lista de balas. Depois
@@ -372,13 +491,13 @@ class EntityManager():
                                    friendly,
                                    damage)
 
-                self.bullets.append(bullet_left)
+                self.add_entity(self.bullets, bullet_left, Layer.BULLETS)
                 self.inactive_bullets.remove(bullet_left)
 
-                self.bullets.append(bullet_center)
+                self.add_entity(self.bullets, bullet_center, Layer.BULLETS)
                 self.inactive_bullets.remove(bullet_center)
 
-                self.bullets.append(bullet_right)
+                self.add_entity(self.bullets, bullet_right, Layer.BULLETS)
                 self.inactive_bullets.remove(bullet_right)
             else:  # Cria novas balas
 
@@ -420,9 +539,9 @@ class EntityManager():
                                    friendly,
                                    damage)
 
-                self.bullets.append(bullet_left)
-                self.bullets.append(bullet_center)
-                self.bullets.append(bullet_right)
+                self.add_entity(self.bullets, bullet_left, Layer.BULLETS)
+                self.add_entity(self.bullets, bullet_center, Layer.BULLETS)
+                self.add_entity(self.bullets, bullet_right, Layer.BULLETS)
 
     def enemy_generator(self):
         '''
@@ -438,6 +557,14 @@ class EntityManager():
 
             enemy_count = self.enemies_limit
 
+        # Gera uma onda em formação periodicamente. Os inimigos da onda ocupam as vagas livres
+        if self.wave_factory.is_ready(self.elapsed_time):
+
+            for enemy in self.wave_factory.generate_wave(self.elapsed_time,
+                                                         self.enemies_limit - len(self.enemies)):
+
+                self.add_entity(self.enemies, enemy, Layer.ENEMIES)
+
         # Gera inimigos quando necessário
         while enemy_count - len(self.enemies) > 0:
 
@@ -445,7 +572,7 @@ class EntityManager():
 
             if enemy is not None:
 
-                self.enemies.append(enemy)
+                self.add_entity(self.enemies, enemy, Layer.ENEMIES)
 
     def reset(self):
         '''
@@ -454,20 +581,33 @@ class EntityManager():
 
         self.score = 0
         self.player.reset((self.screen_size[0] / 2, self.screen_size[1] / 2))
+
+        # Remove os sprites das entidades descartadas
+        for entity in self.enemies + self.bullets + self.animations:
+
+            entity.get_sprite().kill()
+
         self.enemies.clear()
         self.bullets.clear()
         self.animations.clear()
+        self.wave_factory.reset()
         self.elapsed_time = 0.0
+        self.apply_cloud_count()
 
-    def update(self, state, events, tick):
+    def update(self, state, events, tick, frame_time=None):
         '''
-        Atualiza as entidades e seus comportamentos.
+        Atualiza as entidades e seus comportamentos. O tempo do frame, em segundos, é o tempo real
+        medido do último frame. Sem ele é usado o passo fixo da simulação.
         '''
 
         self.event = None  # Reseta o evento
 
         if state == State.GAMEPLAY:  # atualiza apenas durante o gameplay
 
+            # Avança o relógio das animações pelo tempo real, assim imagens são puladas quando o
+            # jogo está atrasado. Na pausa as animações ficam paradas
+            CustomAnimatedSprite.clock.advance(1.0 / tick if frame_time is None else frame_time)
+
             # Comportamento do jogador
             self.player.behaviour(events, self.screen_size, tick)
 
@@ -490,10 +630,13 @@ class EntityManager():
             # dano
             if self.player.is_damaged():
 
-                if len(self.animations) <= self.small_animation_limit:
+                if (len(self.animations) <= self.small_animation_limit and
+                        random() < self.effect_density):
 
-                    self.animations.append(self.animation_factory.generate_explosion(
-                        self.player.get_position(), True))
+                    self.add_entity(self.animations,
+                                    self.animation_factory.generate_explosion(
+                                        self.player.get_position(), True),
+                                    Layer.EFFECTS)
 
                 self.player.play_damage_sound()
 
@@ -507,6 +650,10 @@ class EntityManager():
 
                 cloud.behaviour(self.screen_size)
 
+            if self.background is not None:
+
+                self.background.update(tick)
+
             # Processa o comportamento das balas e as remove da lista quando elas saem da tela
             # ou atingem um inimigo
             for bullet in self.bullets:
@@ -516,7 +663,7 @@ class EntityManager():
                 if not bullet.is_active():
 
                     self.inactive_bullets.append(bullet)
-                    self.bullets.remove(bullet)
+                    self.remove_entity(self.bullets, bullet)
 
             # Processa o comportamento dos inimigos
             for enemy in self.enemies:
@@ -537,10 +684,13 @@ class EntityManager():
                 # Gera uma pequena explosão quando sofre dano. Lógica similar a do jogador
                 if enemy.is_damaged():
 
-                    if len(self.animations) <= self.small_animation_limit:
+                    if (len(self.animations) <= self.small_animation_limit and
+                            random() < self.effect_density):
 
-                        self.animations.append(
-                            self.animation_factory.generate_explosion(enemy.get_position(), True))
+                        self.add_entity(self.animations,
+                                        self.animation_factory.generate_explosion(
+                                            enemy.get_position(), True),
+                                        Layer.EFFECTS)
 
                     enemy.play_damage_sound()
 
@@ -555,10 +705,12 @@ class EntityManager():
                         self.player.change_life(10)
 
                         # Sempre explode, idependente do limite
-                        self.animations.append(
-                            self.animation_factory.generate_explosion(enemy.get_position(), False))
+                        self.add_entity(self.animations,
+                                    self.animation_factory.generate_explosion(
+                                        enemy.get_position(), False),
+                                    Layer.EFFECTS)
 
-                    self.enemies.remove(enemy)  # Remove o inimigo
+                    self.remove_entity(self.enemies, enemy)  # Remove o inimigo
 
             # Processa o comportamento das animações e as remove da lista quando elas acabam
             for animation in self.animations:
@@ -567,7 +719,7 @@ class EntityManager():
 
                 if not animation.is_active():
 
-                    self.animations.remove(animation)
+                    self.remove_entity(self.animations, animation)
 
             self.enemy_generator()  # Processa a geração de inimigos
             self.elapsed_time += (1 / tick)  # Conta o tempo
@@ -612,25 +764,34 @@ class EnemyFactory():
         self.damage_sound = damage_sound
         self.asset_container = asset_container
 
-    def generate_enemy(self, difficulty):
+    def set_screen_size(self, screen_size):
         '''
-        Gera um inimigo e o retorna.
+        Define o tamanho da tela.
+        '''
+
+        self.screen_size = screen_size
+
+    def generate_enemy(self, difficulty, position=None):
+        '''
+        Gera um inimigo e o retorna. Caso a posição não seja definida ela é sorteada.
         '''
 
         enemy = None
 
-        # A posição no spawn é determinada em uma matriz, assim  evita que aviões sejam
-        # instanciados em posições desajustadas
+        if position is None:
+
+            # A posição no spawn é determinada em uma matriz, assim  evita que aviões sejam
+            # instanciados em posições desajustadas
 
-        spawn_positions = []
+            spawn_positions = []
 
-        for i in range(150, self.screen_size[0] - 150, 300):
+            for i in range(150, self.screen_size[0] - 150, 300):
 
-            for j in range(-self.screen_size[1], -150, 300):
+                for j in range(-self.screen_size[1], -150, 300):
 
-                spawn_positions.append((i, j))
+                    spawn_positions.append((i, j))
 
-        position = choice(spawn_positions)
+            position = choice(spawn_positions)
 
         if difficulty > self.max_difficulty:
 
@@ -894,31 +1055,40 @@ class EnemyFactory():
 class AnimationFactory():
 
     '''
-    Auxilia na criação de uma animação.
+    Auxilia na criação de uma animação. As imagens de cada explosão são obtidas no primeiro uso.
     '''
 
-    image_lists: list  # Lista de caminhos para os arquivos
+    image_lists: list  # Imagens de cada explosão. None antes do primeiro uso
     size: tuple  # Tamanho padrão
+    frame_rate: float  # Imagens por segundo das animações
     asset_container: AssetContainer
 
-    def __init__(self, size, asset_container):
-
-        # Obtém o caminho para todos arquivos
+    def __init__(self, size, frame_rate, asset_container):
 
         self.size = size
-        self.image_lists = []
+        self.frame_rate = frame_rate
+        self.image_lists = [None] * 5
         self.asset_container = asset_container
 
-        for i in range(5):
+    def get_image_list(self, index):
+        '''
+        Retorna as imagens de uma explosão, obtendo do container no primeiro uso.
+        '''
+
+        if self.image_lists[index] is None:
 
-            image_list = []
+            directory = f"explosion {index + 1}"
+            file_number = len(self.asset_container.get_sprite("animations", directory))
 
-            file_number = len(self.asset_container.get_sprite("animations", f"explosion {i + 1}"))
+            # As imagens da explosão são carregadas juntas, pelo atlas do diretório
+            self.asset_container.load("sprite", "animations", directory)
 
-            for j in range(file_number):
-                image_list.append(self.asset_container.get_sprite("animations", f"explosion {i + 1}", f"{j}.png"))
+            self.image_lists[index] = [self.asset_container.get_sprite("animations",
+                                                                       directory,
+                                                                       f"{j}.png")
+                                       for j in range(file_number)]
 
-            self.image_lists.append(image_list)
+        return self.image_lists[index]
 
     def generate_explosion(self, position, small):
         '''
@@ -938,7 +1108,13 @@ class AnimationFactory():
             # Caminho do som da explosão
             path = self.asset_container.get_audio("SFX", "Explosion.wav")
 
-        return Explosion(position, self.size, self.image_lists[index], path)
+        image_list = self.get_image_list(index)
+
+        return Explosion(position,
+                         self.size,
+                         image_list,
+                         len(image_list) / self.frame_rate,
+                         path)
 
 
 class BulletType(Enum):
@@ -1453,6 +1629,12 @@ class Enemy(Aircraft):
     '''
 
     score_value: int  # Valor em pontos
+    path: FlightPath  # Trajetória pré-calculada. Pode ser None
+    path_parameter: float  # Parâmetro atual na trajetória
+    path_anchor: tuple  # Origem da trajetória
+    path_offset: list  # Deslocamento acumulado pela direção reativa
+    path_position: tuple  # Última posição definida pela trajetória
+    steering: bool  # Define se a direção reativa é usada junto com a trajetória
 
     def __init__(self,
                  position,
@@ -1489,6 +1671,24 @@ class Enemy(Aircraft):
                          hitbox)
 
         self.score_value = score_value
+        self.path = None
+        self.path_parameter = 0.0
+        self.path_anchor = (0, 0)
+        self.path_offset = [0.0, 0.0]
+        self.path_position = tuple(position)
+        self.steering = True
+
+    def set_path(self, path, anchor, start_parameter=0.0, steering=False):
+        '''
+        Define uma trajetória pré-calculada para o inimigo.
+        '''
+
+        self.path = path
+        self.path_parameter = start_parameter
+        self.path_anchor = anchor
+        self.path_offset = [0.0, 0.0]
+        self.path_position = tuple(self.position)
+        self.steering = steering
 
     def behaviour(self, tick, screen_size, player_position, enemies):
         '''
@@ -1498,8 +1698,63 @@ class Enemy(Aircraft):
         self.stun_behaviour(tick)  # Processa o contador do atordoamento
         self.firerate_behaviour(tick)  # Processa o contador da cadência
 
+        if self.path is not None:  # Caso siga uma trajetória
+
+            self.path_behaviour(tick, player_position, enemies)
+            return
+
         self.velocity[1] = self.speed  # Mantém sempre a mesma velocidade vertical
 
+        self.steering_behaviour(player_position, enemies)
+        self.attack_behaviour(player_position)
+
+        # Desativa o inimigo caso ele saia da tela na lateral ou em baixo
+        if self.position[0] <= 0 - self.size[0] or              \
+           self.position[0] >= screen_size[0] + self.size[0] or \
+           self.position[1] >= screen_size[1] + self.size[1]:
+
+            self.active = False
+
+    def path_behaviour(self, tick, player_position, enemies):
+        '''
+        Comportamento do inimigo em uma trajetória. O parâmetro avança com base na velocidade e a
+        posição é lida da tabela. A direção reativa, quando usada, apenas desloca a trajetória.
+        '''
+
+        if self.steering:
+
+            # A física move o inimigo com a velocidade lateral da direção reativa. Esse
+            # movimento é acumulado como um deslocamento da trajetória
+            self.path_offset[0] += self.position[0] - self.path_position[0]
+            self.path_offset[1] += self.position[1] - self.path_position[1]
+
+            self.velocity[1] = 0
+            self.steering_behaviour(player_position, enemies)
+        else:
+
+            self.velocity = [0, 0]
+
+        self.path_parameter += self.speed / (tick * self.path.get_spacing())
+
+        # Desativa o inimigo quando a trajetória acaba
+        if self.path_parameter >= self.path.get_length():
+
+            self.active = False
+            return
+
+        point = self.path.get_point(self.path_parameter)
+
+        self.path_position = (self.path_anchor[0] + point[0] + self.path_offset[0],
+                              self.path_anchor[1] + point[1] + self.path_offset[1])
+        self.set_position(self.path_position)
+
+        self.attack_behaviour(player_position)
+
+    def steering_behaviour(self, player_position, enemies):
+        '''
+        Direção reativa. Afasta o inimigo dos outros inimigos e o aproxima do jogador.
+        '''
+
         chase_player = True  # Definição se o inimigo deve ou não perseguir o jogador
 
         # Distâncias mínimas
@@ -1552,7 +1807,11 @@ class Enemy(Aircraft):
 
                     self.velocity[0] = self.speed * -direction
 
-        # Ataca o jogador caso estejam próximos nas coordenadas verticais
+    def attack_behaviour(self, player_position):
+        '''
+        Ataca o jogador caso estejam próximos nas coordenadas verticais.
+        '''
+
         if (player_position[0] - self.position[0]) < - 100:
 
             self.attacking = False
@@ -1563,13 +1822,6 @@ class Enemy(Aircraft):
 
             self.attacking = True
 
-        # Desativa o inimigo caso ele saia da tela na lateral ou em baixo
-        if self.position[0] <= 0 - self.size[0] or              \
-           self.position[0] >= screen_size[0] + self.size[0] or \
-           self.position[1] >= screen_size[1] + self.size[1]:
-
-            self.active = False
-
     def get_score_value(self):
         '''
         Retorna a pontuação obtida ao destruir o inimigo.
@@ -1661,11 +1913,11 @@ class Explosion(Entity):
     Entidade que representa uma explosão, ela é usada apenas para fins visuais.
     '''
 
-    def __init__(self, position, size, sprite_path, sound=None):
+    def __init__(self, position, size, sprite_path, duration, sound=None):
 
         super().__init__(position, 0.0, size, True, sprite_path, 0, None)
 
-        self.sprite.start_animation()
+        self.sprite.start_animation(duration)
 
         # Define o som caso tenha um
         if sound is not None:
@@ -1674,11 +1926,9 @@ class Explosion(Entity):
 
     def behaviour(self):
         '''
-        Comportamento da explosão. Anima ela e a desativa quando a animação acaba.
+        Comportamento da explosão. Desativa ela quando a animação acaba.
         '''
 
-        self.sprite.animate_frame()
-
         if not self.sprite.is_animating():
 
             self.active = False
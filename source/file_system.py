@@ -6,11 +6,15 @@ Módulo para o sistema de arquivos.
 
 import json
 
-from os import listdir, makedirs
-from os.path import isfile, join, exists, dirname
+from functools import partial
+from os import listdir, makedirs, sep
+from os.path import isfile, join, exists, dirname, getmtime, relpath
+from threading import Lock
 
 import pygame
 
+from source.states import State
+
 
 class FileSystem():
 
@@ -68,26 +72,208 @@ class FileSystem():
         return self.data
 
 
-class AssetContainer():
+class TextureAtlas():
 
     '''
-    Classe para representar um objeto que contém os assets.
+    Atlas de texturas. Agrupa várias imagens em uma única superfície e mantém um índice com o
+    retângulo de cada imagem.
     '''
 
-    audio: dict
-    sprites: dict
+    surface: pygame.Surface  # Superfície com todas as imagens
+    index: dict  # Retângulo de cada imagem, indexado pelo nome
+
+    def __init__(self, surface, index):
+
+        self.surface = surface
+        self.index = index
+
+    @staticmethod
+    def pack(images, max_width=2048):
+        '''
+        Empacota as imagens em prateleiras e retorna o atlas. As imagens mais altas são colocadas
+        primeiro para diminuir o espaço perdido em cada prateleira.
+        '''
+
+        index = {}
+        position = [0, 0]
+        shelf_height = 0
+        width = 0
+
+        for name in sorted(images, key=lambda key: images[key].get_height(), reverse=True):
+
+            size = images[name].get_size()
+
+            # Começa uma nova prateleira caso a imagem não caiba na atual
+            if position[0] + size[0] > max_width and position[0] > 0:
+
+                position = [0, position[1] + shelf_height]
+                shelf_height = 0
+
+            index[name] = (position[0], position[1], size[0], size[1])
+
+            position[0] += size[0]
+            shelf_height = max(shelf_height, size[1])
+            width = max(width, position[0])
+
+        surface = pygame.Surface((max(width, 1), max(position[1] + shelf_height, 1)), pygame.SRCALPHA)
+
+        # O blend por máximo copia os pixels sem misturar com o fundo transparente
+        for name, rect in index.items():
+
+            surface.blit(images[name], rect[:2], special_flags=pygame.BLEND_RGBA_MAX)
+
+        return TextureAtlas(surface, index)
 
-    def __init__(self):
+    @staticmethod
+    def load(path):
+        '''
+        Carrega um atlas salvo. O caminho não inclui a extensão.
+        '''
+
+        index_file = FileSystem(path + ".json")
+        index = {name: tuple(rect) for name, rect in index_file.get_data()["Frames"].items()}
+
+        return TextureAtlas(pygame.image.load(path + ".png"), index)
+
+    def save(self, path, sources):
+        '''
+        Salva o atlas e o seu índice. As datas de modificação dos arquivos de origem são salvas
+        para que o atlas seja refeito quando algum arquivo mudar.
+        '''
+
+        index_file = FileSystem(path + ".json")
+
+        pygame.image.save(self.surface, path + ".png")
+        index_file.set_data({"Sources": sources, "Frames": self.index})
+
+    @staticmethod
+    def is_valid(path, sources):
+        '''
+        Retorna verdadeiro caso exista um atlas salvo com os mesmos arquivos de origem.
+        '''
+
+        if not exists(path + ".png") or not exists(path + ".json"):
+
+            return False
+
+        return FileSystem(path + ".json").get_data().get("Sources") == sources
+
+    def convert(self):
+        '''
+        Converte a superfície para o formato do display.
+        '''
 
+        self.surface = self.surface.convert_alpha()
+
+    def get_frame(self, name):
+        '''
+        Retorna uma subsuperfície com a imagem. A subsuperfície compartilha os pixels do atlas.
+        '''
+
+        return self.surface.subsurface(self.index[name])
+
+
+class AssetProxy():
+
+    '''
+    Referência a um asset indexado. O asset é carregado no primeiro acesso e mantido depois disso.
+    '''
+
+    loader: None  # Função que carrega o asset
+    asset: None  # Asset carregado. None antes do primeiro acesso
+
+    def __init__(self, loader):
+
+        self.loader = loader
+        self.asset = None
+
+    def get(self):
+        '''
+        Retorna o asset, carregando na primeira vez.
+        '''
+
+        if self.asset is None:
+
+            self.asset = self.loader()
+
+        return self.asset
+
+    def set(self, asset):
+        '''
+        Define o asset já carregado por outro meio.
+        '''
+
+        self.asset = asset
+
+    def is_loaded(self):
+        '''
+        Retorna verdadeiro caso o asset já tenha sido carregado.
+        '''
+
+        return self.asset is not None
+
+
+class AssetContainer():
+
+    '''
+    Classe para representar um objeto que contém os assets. Na inicialização os arquivos são apenas
+    indexados. Cada asset é carregado sozinho no primeiro acesso, assim os assets não usados não
+    ocupam memória. Um diretório de imagens carregado de uma vez usa o atlas do diretório, do qual
+    as imagens são copiadas antes do atlas ser descartado. Os assets de um estado podem ser
+    pré-carregados aos poucos, antes do estado começar.
+    '''
+
+    # Assets usados por cada estado, carregados antes do estado quando a pré-carga é usada. Um
+    # diretório carrega todos os seus arquivos
+    preload_lists: dict = {State.MAIN_MENU: (("sprite", "background", "UI_Background.png"),
+                                             ("audio", "SFX", "Selection.wav")),
+                           State.GAMEPLAY: (("sprite", "planes", "UK_Spitfire.png"),
+                                            ("sprite", "planes", "GER_bf109.png"),
+                                            ("sprite", "planes", "JAP_a6m.png"),
+                                            ("sprite", "planes", "US_p40.png"),
+                                            ("sprite", "planes", "USSR_Lagg3.png"),
+                                            ("sprite", "planes", "GER_bf110.png"),
+                                            ("sprite", "planes", "GER_He111.png"),
+                                            ("sprite", "planes", "JAP_Ki21.png"),
+                                            ("sprite", "planes", "US_a26.png"),
+                                            ("sprite", "planes", "US_b17.png"),
+                                            ("sprite", "planes", "UK_Lancaster.png"),
+                                            ("sprite", "bullets", "Bullet.png"),
+                                            ("sprite", "animations", "explosion 1"),
+                                            ("sprite", "animations", "explosion 2"),
+                                            ("sprite", "animations", "explosion 3"),
+                                            ("sprite", "animations", "explosion 4"),
+                                            ("sprite", "animations", "explosion 5"),
+                                            ("audio", "SFX", "Gun 1.wav"),
+                                            ("audio", "SFX", "Gun 2.wav"),
+                                            ("audio", "SFX", "Gun 3.wav"),
+                                            ("audio", "SFX", "Gun 4.wav"),
+                                            ("audio", "SFX", "Gun 5.wav"),
+                                            ("audio", "SFX", "Damage.wav"),
+                                            ("audio", "SFX", "Explosion.wav"))}
+
+    audio: dict  # Índice dos áudios
+    sprites: dict  # Índice das imagens
+    atlas_path: str  # Pasta onde os atlas são salvos
+    lock: Lock  # Trava do carregamento, pois a thread de renderização também obtém assets
+    preload_queue: list  # Assets a serem pré-carregados
+
+    def __init__(self, atlas_path=join("Data", "Atlas")):
+
+        self.atlas_path = atlas_path
+        self.lock = Lock()
+        self.preload_queue = []
         self.audio = self.build_dir_dict(join("assets", "audio"), "audio")
         self.sprites = self.build_dir_dict(join("assets", "sprites"), "sprite")
 
     def build_dir_dict(self, path: str, mode: str):
         '''
-        Constrói um dicionário com os diretórios
+        Constrói um dicionário com os diretórios. Os arquivos são representados por referências que
+        carregam o asset no primeiro acesso.
         '''
 
         dir_dict = {}
+        files = []
 
         for file in listdir(path):
 
@@ -96,29 +282,56 @@ class AssetContainer():
             else:
 
                 if mode == "audio":
-                    dir_dict[file] = pygame.mixer.Sound(join(path, file))
+                    dir_dict[file] = AssetProxy(partial(pygame.mixer.Sound, join(path, file)))
                 else:
-                    dir_dict[file] = pygame.image.load(join(path, file)).convert_alpha()
+                    files.append(file)
+
+        for file in files:
+            dir_dict[file] = AssetProxy(partial(self.load_image, join(path, file)))
 
         return dir_dict
 
-    def get_asset(self, mode: str, *path):
+    @staticmethod
+    def load_image(path: str):
         '''
-        Obtém um asset.
+        Carrega uma imagem e a converte para o formato do display.
         '''
 
-        asset = None
+        return pygame.image.load(path).convert_alpha()
 
-        if mode == "audio":
+    def build_atlas(self, path: str, files: list):
+        '''
+        Obtém o atlas de um diretório. Usa o atlas salvo quando ele está atualizado, caso contrário
+        empacota as imagens e salva o atlas.
+        '''
+
+        name = relpath(path, join("assets", "sprites")).replace(sep, "_")
+        atlas_file = join(self.atlas_path, name)
+        sources = {file: getmtime(join(path, file)) for file in sorted(files)}
 
-            asset = self.audio
-            for subpath in path:
-                asset = asset[subpath]
+        if TextureAtlas.is_valid(atlas_file, sources):
+
+            atlas = TextureAtlas.load(atlas_file)
         else:
 
-            asset = self.sprites
-            for subpath in path:
-                asset = asset[subpath]
+            atlas = TextureAtlas.pack({file: pygame.image.load(join(path, file)) for file in files})
+            atlas.save(atlas_file, sources)
+
+        atlas.convert()
+
+        return atlas
+
+    def get_asset(self, mode: str, *path):
+        '''
+        Obtém um asset. Os diretórios são retornados como dicionários de referências.
+        '''
+
+        self.load(mode, *path)
+        asset = self.get_index(mode, *path)
+
+        if isinstance(asset, AssetProxy):
+
+            asset = asset.get()
 
         return asset
 
@@ -135,3 +348,117 @@ class AssetContainer():
         '''
 
         return self.get_asset("sprite", *path)
+
+    def preload(self, state):
+        '''
+        Carrega todos os assets de um estado.
+        '''
+
+        for mode, *path in self.preload_lists.get(state, ()):
+
+            self.load(mode, *path)
+
+    def queue_preload(self, state):
+        '''
+        Adiciona os assets de um estado na fila de pré-carga.
+        '''
+
+        self.preload_queue.extend(self.preload_lists.get(state, ()))
+
+    def preload_next(self):
+        '''
+        Carrega o próximo asset da fila que ainda não foi carregado. Feito para ser chamado uma vez
+        por frame nos menus, o que distribui o carregamento entre os frames. Retorna falso quando a
+        fila está vazia.
+        '''
+
+        while len(self.preload_queue) > 0:
+
+            mode, *path = self.preload_queue.pop(0)
+
+            if self.load(mode, *path):
+
+                return True
+
+        return False
+
+    def load(self, mode: str, *path):
+        '''
+        Carrega um asset ou todos os arquivos de um diretório. As imagens de um diretório são
+        copiadas do atlas, que é decodificado uma única vez e descartado depois. Retorna verdadeiro
+        caso algum asset tenha sido carregado.
+        '''
+
+        entry = self.get_index(mode, *path)
+
+        if isinstance(entry, AssetProxy):
+
+            if entry.is_loaded():
+
+                return False
+
+            with self.lock:  # Apenas o carregamento usa a trava
+
+                entry.get()
+
+            return True
+
+        proxies = {file: proxy for file, proxy in entry.items() if isinstance(proxy, AssetProxy)}
+        pending = {file: proxy for file, proxy in proxies.items() if not proxy.is_loaded()}
+
+        if len(pending) == 0:
+
+            return False
+
+        with self.lock:
+
+            if mode == "audio":
+
+                for proxy in pending.values():
+
+                    proxy.get()
+            else:
+
+                # As cópias não mantêm o atlas inteiro na memória
+                atlas = self.build_atlas(join("assets", "sprites", *path), list(proxies))
+
+                for file, proxy in pending.items():
+
+                    proxy.set(atlas.get_frame(file).copy())
+
+        return True
+
+    def get_index(self, mode: str, *path):
+        '''
+        Obtém a referência de um asset sem carregá-lo.
+        '''
+
+        entry = self.audio if mode == "audio" else self.sprites
+
+        for subpath in path:
+
+            entry = entry[subpath]
+
+        return entry
+
+    def get_statistics(self):
+        '''
+        Retorna a quantidade de assets indexados e carregados.
+        '''
+
+        proxies = []
+        directories = [self.audio, self.sprites]
+
+        while len(directories) > 0:
+
+            for entry in directories.pop().values():
+
+                if isinstance(entry, dict):
+
+                    directories.append(entry)
+                else:
+
+                    proxies.append(entry)
+
+        return {"Indexed": len(proxies),
+                "Loaded": sum(1 for proxy in proxies if proxy.is_loaded())}
@@ -7,7 +7,7 @@ Módulo para o gerenciador de jogo.
 import sys
 
 from random import seed
-from time import time_ns
+from time import perf_counter, time_ns
 from os.path import join
 
 import pygame
@@ -16,8 +16,11 @@ from source.states import Event, State
 from source.file_system import FileSystem, AssetContainer
 from source.entities import EntityManager
 from source.physics import PhysicsManager
-from source.graphics import GraphicsManager
+from source.graphics import (GraphicsManager, RenderTarget, HardwareRenderTarget, RenderPipeline,
+                             FrameSnapshot)
 from source.user_interface import UserInterfaceManager
+from source.quality import QualityGovernor
+from source.pacing import FramePacer
 
 
 class GameManager():
@@ -26,18 +29,24 @@ class GameManager():
     Classe que gerencia o funcionamento do jogo e armazena dados do jogador.
     '''
 
-    clock: pygame.time.Clock  # CLock para o fps
-    display: pygame.display.set_mode  # Display da tela
+    pacer: FramePacer  # Controle do ritmo dos frames
+    focused: bool  # Define se a janela tem o foco
+    render_target: RenderTarget  # Superfície de renderização com a resolução interna
+    display: pygame.Surface  # Superfície onde o jogo é desenhado (ou o alvo do renderizador)
+    render_pipeline: RenderPipeline  # Thread de renderização. None no modo sequencial
     music_channel: pygame.mixer.Channel  # Canal de música
     state: State  # Estado do jogo
     events: list  # Lista de eventos
     asset_container: AssetContainer
     file_system: FileSystem  # Sistema de arquivos
+    settings_file: FileSystem  # Arquivo de configurações
     data: dict  # Dados
+    settings: dict  # Configurações
     entities: EntityManager  # Sistema de entidades
     physics: PhysicsManager  # Sistema de física
     graphics: GraphicsManager  # Sistema gráfico
     user_interface: UserInterfaceManager  # Sistema de interface
+    quality: QualityGovernor  # Ajuste automático da qualidade
 
     def __init__(self, version):
 
@@ -48,11 +57,76 @@ class GameManager():
         pygame.font.init()
         pygame.mixer.init()
 
-        self.clock = pygame.time.Clock()
-        self.display = pygame.display.set_mode(flags=pygame.FULLSCREEN)
+        # Carrega as configurações. Valores ausentes no arquivo usam o padrão
+        self.settings_file = FileSystem(join("Data", "Settings.json"))
+
+        self.settings = {"Render Resolution": None,  # None usa a resolução da tela
+                         "Scaling": "Integer",  # "Integer" ou "Smooth"
+                         "Renderer": "Software",  # "Software" ou "Hardware"
+                         "Pipelined Rendering": False,  # Renderiza em paralelo com a simulação
+                         "Cloud Compositing": True,  # Pré-renderiza as nuvens em faixas
+                         "Adaptive Quality": True,  # Ajusta a qualidade pelo tempo dos frames
+                         "Quality Level": 2,  # Nível inicial, de 0 a 3
+                         "Performance Report": False,  # Mostra as medições de desempenho no terminal
+                         "VSync": False,  # Sincronia vertical, apenas no renderizador acelerado
+                         "Spin Time": 0.002,  # Final da espera do frame feito sem dormir
+                         "UI Prebuild": True,  # Constrói as interfaces durante o menu principal
+                         "UI Memory Budget": None,  # Limite de memória das interfaces em bytes
+                         "Asset Preload": True,  # Carrega os assets do gameplay durante os menus
+                         "Idle Timeout": 1.0,  # Espera máxima por eventos nos menus, em segundos
+                         "Unfocused Frame Rate": 10,  # Taxa de frames sem o foco da janela
+                         "Pause On Focus Loss": True,  # Pausa o gameplay quando perde o foco
+                         "Display Mode": "Fullscreen",  # "Fullscreen", "Windowed" ou "Resizable"
+                         "Window Size": [1280, 720]}  # Tamanho da janela fora da tela cheia
+
+        self.settings.update(self.settings_file.get_data())
+        self.settings_file.set_data(self.settings)
+
+        self.render_target = None
+
+        # Fora da tela cheia a janela tem o tamanho configurado
+        windowed = self.settings["Display Mode"] != "Fullscreen"
+        resizable = self.settings["Display Mode"] == "Resizable"
+        window_size = tuple(self.settings["Window Size"]) if windowed else None
+
+        # O renderizador acelerado é usado quando configurado e disponível
+        if self.settings["Renderer"] == "Hardware":
+
+            try:
+
+                self.render_target = HardwareRenderTarget(self.settings["Render Resolution"],
+                                                          self.settings["Scaling"],
+                                                          self.settings["VSync"],
+                                                          window_size,
+                                                          resizable)
+            except RuntimeError:
+
+                self.render_target = None  # Sem GPU usa o renderizador por software
+
+        if self.render_target is None:
+
+            if windowed:
+
+                screen = pygame.display.set_mode(window_size, pygame.RESIZABLE if resizable else 0)
+            else:
+
+                screen = pygame.display.set_mode(flags=pygame.FULLSCREEN)
+
+            self.render_target = RenderTarget(screen,
+                                              self.settings["Render Resolution"],
+                                              self.settings["Scaling"])
+
+        self.display = self.render_target.get_surface()
+        self.pacer = None
+        self.focused = True
 
         # Serialization
         self.asset_container = AssetContainer()
+        self.asset_container.preload(State.MAIN_MENU)  # Assets do primeiro frame
+
+        if self.settings["Asset Preload"]:
+
+            self.asset_container.queue_preload(State.GAMEPLAY)
 
         self.music_channel = pygame.mixer.Channel(0)
         self.music = pygame.mixer.Sound(self.asset_container.get_audio("music", "Music 1.wav"))
@@ -80,33 +154,112 @@ class GameManager():
 
             self.file_system.set_data(self.data)
 
-        # Obtém o tamanho da tela
-        screen_size = (self.display.get_width(), self.display.get_height())
+        # Obtém o tamanho da tela. Com uma resolução interna o jogo independe da tela física
+        screen_size = self.render_target.get_size()
+        sky_color = (92, 184, 230)  # Cor do céu
 
-        self.entities = EntityManager(screen_size, 100, 10, 5, self.asset_container)
+        self.entities = EntityManager(screen_size,
+                                      100,
+                                      10,
+                                      5,
+                                      self.asset_container,
+                                      sky_color if self.settings["Cloud Compositing"] else None)
         self.physics = PhysicsManager()
-        self.graphics = GraphicsManager((92, 184, 230))
-        self.user_interface = UserInterfaceManager(screen_size, version, self.asset_container)
+        self.graphics = GraphicsManager(sky_color, self.render_target.supports_dirty_rects())
+        self.user_interface = UserInterfaceManager(screen_size,
+                                                   version,
+                                                   self.asset_container,
+                                                   self.settings["UI Memory Budget"])
+        self.user_interface.set_display_retention(self.render_target.supports_dirty_rects())
+        self.render_pipeline = None
+
+        if self.settings["Pipelined Rendering"] and self.render_target.supports_render_thread():
+
+            self.render_pipeline = RenderPipeline(self.render_target,
+                                                  self.graphics,
+                                                  self.user_interface)
+
+        self.quality = QualityGovernor(self.settings["Quality Level"])
+        self.apply_quality()
+
+    def apply_quality(self):
+        '''
+        Aplica as alavancas do nível de qualidade atual em cada sistema.
+        '''
+
+        quality_settings = self.quality.get_settings()
+
+        self.entities.set_small_animation_limit(quality_settings["Small Explosions"])
+        self.entities.set_effect_density(quality_settings["Effect Density"])
+        self.entities.set_cloud_count(quality_settings["Clouds"])
+        self.render_target.set_smooth_filter(quality_settings["Smooth Filter"])
+        pygame.mixer.set_num_channels(quality_settings["Sound Channels"])
 
     def run_game(self, tick):
         '''
         Roda o jogo.
         '''
 
+        self.pacer = FramePacer(tick, self.settings["Spin Time"], self.render_target.has_vsync())
+
+        previous_state = None  # Estado do último frame
+        pending_work = False  # Define se algum sistema tem trabalho para os próximos frames
+        frame_time = 1.0 / tick  # Duração medida do último frame em segundos
+
         while self.state != State.EXIT:  # Enquando o jogo não for encerrado
 
-            events = pygame.event.get()  # Obtém os eventos (teclado e mouse)
+            frame_start = perf_counter()
+
+            # Nos menus nada muda sem eventos. Depois do primeiro frame do estado o loop dorme até
+            # um evento chegar, sem atualizar os sistemas nem a tela
+            if self.state != State.GAMEPLAY and self.state == previous_state and not pending_work:
+
+                events = self.wait_events()
+
+                if len(events) == 0:
+
+                    continue
+
+                self.pacer.reset()  # A espera não conta como um frame atrasado
+            else:
+
+                events = pygame.event.get()
+
+            previous_state = self.state
+
+            # Converte o mouse para a resolução interna
+            events = [self.render_target.map_event(event) for event in events]
+            self.handle_window_events(events, tick)
 
             # Atualiza cada sistema
-            self.entities.update(self.state, events, tick)
-            self.physics.update(self.state, tick, self.entities.get_entities(True))
-            self.graphics.update(self.state, self.display, self.entities.get_entities(False))
-            self.user_interface.update(self.state,
-                                       self.display,
-                                       events,
-                                       self.data,
-                                       self.entities.get_score(),
-                                       self.entities.get_player_life())
+            self.entities.update(self.state, events, tick, frame_time)
+            self.physics.update(self.state, tick, self.entities.get_entities())
+
+            if self.render_pipeline is None:  # Modo sequencial
+
+                self.graphics.update(self.state,
+                                     self.display,
+                                     self.entities.get_render_group(),
+                                     self.entities.get_background())
+                self.user_interface.update(self.state,
+                                           self.display,
+                                           events,
+                                           self.data,
+                                           self.entities.get_score(),
+                                           self.entities.get_player_life())
+
+                # Informa ao sistema gráfico as regiões ocupadas pela interface
+                self.graphics.set_overlay_rects(self.user_interface.get_dirty_rects())
+            else:
+
+                # A interface é desenhada pela thread de renderização a partir da cópia do estado
+                self.user_interface.handle_events(self.state, events)
+                self.render_pipeline.submit(FrameSnapshot(self.state,
+                                                          self.entities.get_render_group(),
+                                                          self.data,
+                                                          self.entities.get_score(),
+                                                          self.entities.get_player_life(),
+                                                          self.entities.get_background()))
 
             # Obtém os eventos de cada sistema
             self.events.append(self.entities.get_event())
@@ -181,14 +334,158 @@ class GameManager():
 
             self.events.clear()
 
-            pygame.display.update()  # Atualiza o display
-            self.clock.tick(tick)  # Espera o clock
+            # Atualiza o display. Quando possível apenas as regiões alteradas são atualizadas
+            if self.render_pipeline is None:
+
+                self.render_target.present(self.graphics.get_dirty_rects())
+
+            # As interfaces ainda não usadas são construídas enquanto o menu principal é mostrado.
+            # Depois disso os assets do gameplay são carregados, um por frame, enquanto os menus são
+            # mostrados
+            pending_work = False
+
+            if self.settings["UI Prebuild"] and self.state == State.MAIN_MENU:
+
+                pending_work = self.user_interface.prebuild()
+
+            if not pending_work and self.state != State.GAMEPLAY:
+
+                pending_work = self.asset_container.preload_next()
+
+            # A qualidade é ajustada pelo tempo de trabalho do frame, sem a espera do clock
+            if self.settings["Adaptive Quality"] and self.state == State.GAMEPLAY:
+
+                if self.quality.update(perf_counter() - frame_start, 1.0 / tick):
+
+                    self.apply_quality()
+
+                    if self.settings["Performance Report"]:
+
+                        self.report_quality_transition(self.quality.get_transitions()[-1])
+
+            frame_time = self.pacer.tick() / 1000.0  # Espera o prazo do frame
+
+        if self.render_pipeline is not None:
+
+            self.render_pipeline.stop()  # Espera o último frame
+
+        if self.settings["Performance Report"]:
+
+            self.report_performance()
 
         # Salva os dados e encerra o jogo
         self.file_system.write_file()
         pygame.quit()
         sys.exit()
 
+    def report_performance(self):
+        '''
+        Mostra no terminal as medições de desempenho da sessão.
+        '''
+
+        statistics = self.pacer.get_statistics()
+
+        print(f"Frames: {statistics['Frames']}, {statistics['Missed']} atrasados, "
+              f"p50 {statistics['P50']:.2f} ms, p95 {statistics['P95']:.2f} ms, "
+              f"p99 {statistics['P99']:.2f} ms")
+
+        # Histograma com faixas de 1 ms
+        for frame_bin, count in self.pacer.get_histogram(1.0).items():
+
+            print(f"    {frame_bin:5.0f} ms: {count}")
+
+        print(f"Qualidade: nível final {self.quality.get_level()}, "
+              f"{len(self.quality.get_transitions())} mudanças")
+
+        for transition in self.quality.get_transitions():
+
+            self.report_quality_transition(transition)
+
+    @staticmethod
+    def report_quality_transition(transition):
+        '''
+        Mostra no terminal uma mudança do nível de qualidade.
+        '''
+
+        frame, previous_level, level, load = transition
+        load_text = "-" if load is None else f"{load:.2f}"
+
+        print(f"Qualidade: nível {previous_level} -> {level} no frame {frame} (carga {load_text})")
+
+    def wait_events(self):
+        '''
+        Espera um evento até o tempo limite. Retorna o evento e os que chegaram junto, ou uma lista
+        vazia caso o tempo tenha acabado.
+        '''
+
+        event = pygame.event.wait(int(self.settings["Idle Timeout"] * 1000))
+
+        if event.type == pygame.NOEVENT:
+
+            return []
+
+        return [event] + pygame.event.get()
+
+    def handle_window_events(self, events, tick):
+        '''
+        Trata os eventos da janela. Sem o foco a taxa de frames é reduzida e o gameplay é pausado,
+        caso configurado. Sem a pausa a simulação fica mais lenta, pois o passo de tempo é fixo.
+        '''
+
+        for event in events:
+
+            if event.type == pygame.VIDEORESIZE:
+
+                self.resize_display()
+            elif event.type == pygame.WINDOWFOCUSLOST:
+
+                self.focused = False
+            elif event.type == pygame.WINDOWFOCUSGAINED:
+
+                self.focused = True
+            elif event.type == pygame.WINDOWEXPOSED:
+
+                self.user_interface.invalidate()  # A janela deve ser redesenhada inteira
+
+        if not self.focused and self.state == State.GAMEPLAY:
+
+            if self.settings["Pause On Focus Loss"]:
+
+                self.state = State.PAUSE
+
+        self.pacer.set_frame_rate(tick if self.focused else self.settings["Unfocused Frame Rate"])
+
+    def resize_display(self):
+        '''
+        Ajusta o jogo ao novo tamanho da janela. A thread de renderização é parada durante o ajuste.
+        Quando o tamanho onde o jogo é desenhado muda, as entidades e as interfaces são
+        reposicionadas no lugar de serem criadas novamente. Com uma resolução interna apenas a
+        escala muda.
+        '''
+
+        if self.render_pipeline is not None:
+
+            self.render_pipeline.stop()
+
+        if self.render_target.resize():
+
+            self.display = self.render_target.get_surface()
+
+            screen_size = self.render_target.get_size()
+
+            self.entities.resize(screen_size)
+            self.user_interface.resize(screen_size)
+
+        # O próximo frame redesenha a tela inteira
+        self.graphics.invalidate()
+        self.user_interface.invalidate()
+
+        if self.render_pipeline is not None:
+
+            self.render_pipeline = RenderPipeline(self.render_target,
+                                                  self.graphics,
+                                                  self.user_interface)
+
     def change_modifiers(self, modifier, increase):
         '''
         Muda os modificadores. Limita cada modificador a um intervalo de 0 a 100. Cada modificação
@@ -4,71 +4,1559 @@
 Módulo para o sistema gráfico.
 '''
 
+from collections import OrderedDict
+from enum import Enum
+from os import environ
+from queue import Queue
+from threading import Lock, Thread
+from weakref import WeakKeyDictionary
+
 import pygame
 
-from source.states import State
+try:  # O renderizador acelerado depende do módulo de SDL2 do pygame
+    from pygame._sdl2.video import Window, Renderer, Texture
+except ImportError:
+    Window = Renderer = Texture = None
+
+from source.states import State
+
+
+class Layer(Enum):
+
+    '''
+    Camadas de renderização, da mais ao fundo para a mais à frente.
+    '''
+
+    CLOUDS = 0
+    BULLETS = 1
+    ENEMIES = 2
+    PLAYER = 3
+    EFFECTS = 4
+
+
+class BlitMode(Enum):
+
+    '''
+    Modos de desenho de uma superfície, do mais barato para o mais caro.
+    '''
+
+    OPAQUE = 1  # Sem transparência
+    COLORKEY = 2  # Transparência binária com cor chave e RLE
+    ALPHA = 3  # Transparência por pixel
+
+
+class GraphicsManager():
+
+    '''
+    Gerencia os graficos durante o gameplay.
+    '''
+
+    background_color: pygame.color.Color  # Cor do plano de fundo
+    dirty_rendering: bool  # Define se apenas as regiões alteradas são redesenhadas
+    dirty_rects: list  # Regiões alteradas no último frame. None indica a tela inteira
+    overlay_rects: list  # Regiões ocupadas pela interface sobre o gameplay
+    previous_state: State  # Estado do último frame
+
+    def __init__(self, background_color, dirty_rendering=True):
+
+        self.background_color = pygame.color.Color(background_color)
+        self.dirty_rendering = dirty_rendering
+        self.dirty_rects = None
+        self.overlay_rects = []
+        self.previous_state = None
+
+    def update(self, state, display, render_group, background=None):
+        '''
+        Atualiza os gráficos. As camadas de renderização são mantidas pelo sistema de entidades, que
+        adiciona e remove os sprites conforme as entidades surgem e são destruídas. Com o plano de
+        fundo composto as regiões das nuvens também são redesenhadas e atualizadas.
+        '''
+
+        self.dirty_rects = None  # Por padrão a tela inteira é atualizada
+
+        if state == State.GAMEPLAY:  # Se for o gameplay
+
+            # A tela inteira é redesenhada quando o gameplay começa, pois a interface ocupava a tela
+            full_redraw = (not self.dirty_rendering or
+                           self.previous_state != State.GAMEPLAY or
+                           self.overlay_rects is None)
+
+            cloud_rects = []
+
+            if background is not None:
+
+                # Regiões das nuvens no último frame e no atual
+                cloud_rects = background.get_dirty_rects(display.get_height())
+
+            if full_redraw:
+
+                if background is not None:
+
+                    background.render(display)  # Desenha o céu e as nuvens
+                else:
+
+                    display.fill(self.background_color)  # Preenche a tela com a cor do fundo
+            else:
+
+                clear_region = self.clear_region
+
+                if background is not None:
+
+                    clear_region = background.render_region
+
+                # Limpa apenas as regiões ocupadas pelos sprites e pela interface no último frame e
+                # as regiões das nuvens
+                render_group.clear(display, clear_region)
+
+                for rect in self.overlay_rects + cloud_rects:
+
+                    clear_region(display, rect)
+
+            # As regiões dos lotes só são necessárias quando o redesenho parcial pode ser usado
+            render_group.set_rect_tracking(self.dirty_rendering)
+
+            # Renderiza as camadas em ordem. As regiões retornadas incluem as posições antigas e as
+            # dos sprites removidos
+            rects = render_group.draw(display)
+
+            if not full_redraw:
+
+                self.dirty_rects = rects + self.overlay_rects + cloud_rects
+        elif self.dirty_rendering:
+
+            self.dirty_rects = []  # Fora do gameplay apenas a interface altera a tela
+
+        self.previous_state = state
+
+    def render_snapshot(self, display, snapshot):
+        '''
+        Desenha o gameplay a partir de uma cópia do estado. Usado pela thread de renderização, que não
+        acessa os grupos de sprites modificados pela simulação.
+        '''
+
+        if snapshot.state == State.GAMEPLAY:
+
+            if snapshot.background is not None:
+
+                snapshot.background.render(display, snapshot.background_offsets)
+            else:
+
+                display.fill(self.background_color)
+
+            display.blits(snapshot.sprites, doreturn=False)
+
+        self.previous_state = snapshot.state
+
+    def invalidate(self):
+        '''
+        Faz a tela inteira ser redesenhada no próximo frame.
+        '''
+
+        self.previous_state = None
+
+    def clear_region(self, display, rect):
+        '''
+        Preenche uma região com a cor do plano de fundo.
+        '''
+
+        display.fill(self.background_color, rect)
+
+    def set_overlay_rects(self, rects):
+        '''
+        Define as regiões ocupadas pela interface sobre o gameplay. None indica a tela inteira.
+        '''
+
+        self.overlay_rects = rects
+
+    def get_dirty_rects(self):
+        '''
+        Retorna as regiões alteradas no último frame. Retorna None caso a tela inteira deva ser
+        atualizada.
+        '''
+
+        if self.dirty_rects is None or self.overlay_rects is None:
+
+            return None
+
+        return self.dirty_rects + self.overlay_rects
+
+
+class SpriteBatch(pygame.sprite.Group):
+
+    '''
+    Lote de sprites pequenos desenhados com uma única chamada de blits, sem o custo por sprite do
+    desenho das camadas. As regiões desenhadas podem ser ignoradas quando a tela é sempre
+    redesenhada por inteiro.
+    '''
+
+    track_rects: bool  # Define se as regiões desenhadas são guardadas
+    previous_rects: list  # Regiões desenhadas no último frame
+
+    def __init__(self, *sprites):
+
+        super().__init__(*sprites)
+
+        self.track_rects = True
+        self.previous_rects = []
+
+    def set_rect_tracking(self, track_rects):
+        '''
+        Define se as regiões desenhadas são guardadas. Sem as regiões a tela deve ser redesenhada
+        por inteiro a cada frame.
+        '''
+
+        self.track_rects = track_rects
+
+        if not track_rects:
+
+            self.previous_rects = []
+
+    def get_visible_sprites(self, viewport):
+        '''
+        Retorna os sprites do lote dentro da área visível.
+        '''
+
+        return [sprite for sprite in self.sprites() if sprite.rect.colliderect(viewport)]
+
+    def draw_batch(self, surface, sprites=None):
+        '''
+        Desenha os sprites do lote, ou apenas os informados. Retorna as regiões alteradas, incluindo
+        as do último frame.
+        '''
+
+        if sprites is None:
+
+            sprites = self.sprites()
+
+        dirty = self.previous_rects
+        blit_sequence = [(sprite.image, sprite.rect) for sprite in sprites]
+
+        if self.track_rects:
+
+            self.previous_rects = surface.blits(blit_sequence)  # Regiões já recortadas pela tela
+        else:
+
+            surface.blits(blit_sequence, doreturn=False)
+
+        return dirty + self.previous_rects
+
+    def get_previous_rects(self):
+        '''
+        Retorna as regiões desenhadas no último frame.
+        '''
+
+        return self.previous_rects
+
+
+class CulledLayeredUpdates(pygame.sprite.LayeredUpdates):
+
+    '''
+    Camadas de renderização que descartam os sprites fora da área visível antes do desenho. As
+    regiões alteradas continuam corretas: quando um sprite sai da tela a posição antiga é limpa.
+    Camadas com um lote de sprites recebem os sprites adicionados nelas e são desenhadas em uma
+    única operação, na ordem das camadas.
+    '''
+
+    viewport: pygame.Rect  # Área visível
+    batches: dict  # Lotes de sprites por camada
+    drawn: int  # Sprites desenhados no último frame
+    culled: int  # Sprites descartados no último frame
+
+    def __init__(self, viewport, *sprites, **kwargs):
+
+        self.viewport = pygame.Rect(viewport)
+        self.batches = {}
+        self.drawn = 0
+        self.culled = 0
+
+        super().__init__(*sprites, **kwargs)
+
+    def set_viewport(self, viewport):
+        '''
+        Define a área visível.
+        '''
+
+        self.viewport = pygame.Rect(viewport)
+
+    def set_batch(self, layer, batch):
+        '''
+        Define o lote de sprites de uma camada.
+        '''
+
+        self.batches[layer] = batch
+
+    def set_rect_tracking(self, track_rects):
+        '''
+        Define se os lotes calculam as regiões desenhadas.
+        '''
+
+        for batch in self.batches.values():
+
+            batch.set_rect_tracking(track_rects)
+
+    def add(self, *sprites, **kwargs):
+        '''
+        Adiciona sprites. Os sprites de camadas com lote são adicionados no lote.
+        '''
+
+        layer = kwargs.get("layer")
+
+        if layer in self.batches:
+
+            self.batches[layer].add(*sprites)
+        else:
+
+            super().add(*sprites, **kwargs)
+
+    def clear(self, surface, bgd):
+        '''
+        Limpa as regiões ocupadas pelos sprites e pelos lotes no último frame.
+        '''
+
+        super().clear(surface, bgd)
+
+        for batch in self.batches.values():
+
+            for rect in batch.get_previous_rects():
+
+                bgd(surface, rect)
+
+    def draw(self, surface, bgsurf=None, special_flags=0):
+        '''
+        Desenha os sprites visíveis em ordem e retorna as regiões alteradas.
+        '''
+
+        spritedict = self.spritedict
+        dirty = self.lostsprites
+        self.lostsprites = []
+        init_rect = self._init_rect
+        pending_batches = sorted(self.batches.items())
+
+        self.drawn = 0
+        self.culled = 0
+
+        for sprite in self.sprites():
+
+            # Os lotes são desenhados antes das camadas acima deles
+            while pending_batches and pending_batches[0][0] < self.get_layer_of_sprite(sprite):
+
+                dirty += self.draw_pending_batch(surface, pending_batches.pop(0)[1])
+
+            old_rect = spritedict[sprite]
+
+            if not sprite.rect.colliderect(self.viewport):
+
+                self.culled += 1
+
+                # A posição antiga ainda precisa ser limpa caso o sprite estivesse na tela
+                if old_rect is not init_rect:
+
+                    dirty.append(old_rect)
+                    spritedict[sprite] = init_rect
+
+                continue
+
+            self.drawn += 1
+            new_rect = surface.blit(sprite.image, sprite.rect, None, special_flags)
+
+            if old_rect is init_rect:
+
+                dirty.append(new_rect)
+            elif new_rect.colliderect(old_rect):
+
+                dirty.append(new_rect.union(old_rect))
+            else:
+
+                dirty.append(new_rect)
+                dirty.append(old_rect)
+
+            spritedict[sprite] = new_rect
+
+        for _, batch in pending_batches:
+
+            dirty += self.draw_pending_batch(surface, batch)
+
+        return dirty
+
+    def draw_pending_batch(self, surface, batch):
+        '''
+        Desenha os sprites visíveis de um lote e atualiza os contadores.
+        '''
+
+        visible_sprites = batch.get_visible_sprites(self.viewport)
+
+        self.drawn += len(visible_sprites)
+        self.culled += len(batch) - len(visible_sprites)
+
+        return batch.draw_batch(surface, visible_sprites)
+
+    def get_visible_sprites(self):
+        '''
+        Retorna os sprites visíveis na ordem das camadas, incluindo os lotes. Atualiza os contadores.
+        '''
+
+        visible_sprites = []
+        pending_batches = sorted(self.batches.items())
+
+        for sprite in self.sprites():
+
+            while pending_batches and pending_batches[0][0] < self.get_layer_of_sprite(sprite):
+
+                visible_sprites += pending_batches.pop(0)[1].get_visible_sprites(self.viewport)
+
+            if sprite.rect.colliderect(self.viewport):
+
+                visible_sprites.append(sprite)
+
+        for _, batch in pending_batches:
+
+            visible_sprites += batch.get_visible_sprites(self.viewport)
+
+        self.drawn = len(visible_sprites)
+        self.culled = len(self) + sum(len(batch) for batch in self.batches.values()) - self.drawn
+
+        return visible_sprites
+
+    def get_statistics(self):
+        '''
+        Retorna a quantidade de sprites desenhados e descartados no último frame.
+        '''
+
+        return {"Drawn": self.drawn, "Culled": self.culled}
+
+
+class RenderTarget():
+
+    '''
+    Superfície de renderização. O jogo pode ser desenhado em uma resolução interna fixa, que é
+    escalada para a tela uma vez por frame. Sem resolução interna a própria tela é usada.
+    '''
+
+    screen: pygame.Surface  # Superfície da tela
+    surface: pygame.Surface  # Superfície interna
+    surface_size: tuple  # Tamanho da superfície no último ajuste
+    resolution: tuple  # Resolução interna. None usa a resolução da tela
+    requested_scaling: str  # Modo de escala configurado
+    scaling: str  # Modo de escala: "Integer" ou "Smooth"
+    destination: pygame.Rect  # Região da tela onde a imagem escalada é desenhada
+    smooth_filter: bool  # Define se a escala suave usa filtragem
+    full_update: bool  # Define se a tela inteira deve ser atualizada no próximo frame
+
+    def __init__(self, screen, resolution=None, scaling="Integer"):
+
+        self.screen = None
+        self.surface = None
+        self.surface_size = None
+        self.resolution = None if resolution is None else tuple(resolution)
+        self.requested_scaling = scaling
+        self.smooth_filter = True
+
+        self.resize(screen)
+
+    def resize(self, screen=None):
+        '''
+        Ajusta a renderização ao tamanho atual da tela. A superfície interna é mantida, apenas a
+        região de destino muda. Sem resolução interna a própria tela é usada. Retorna verdadeiro
+        caso o tamanho onde o jogo é desenhado tenha mudado.
+        '''
+
+        if screen is None:
+
+            screen = pygame.display.get_surface()
+
+        previous_screen = self.screen
+
+        self.screen = screen
+        self.scaling = self.requested_scaling
+        self.full_update = True
+
+        if self.resolution is None or self.resolution == screen.get_size():
+
+            self.surface = screen
+            self.destination = screen.get_rect()
+        else:
+
+            # A superfície interna só é criada quando ainda não existe
+            if self.surface is None or self.surface is previous_screen:
+
+                self.surface = pygame.Surface(self.resolution).convert()
+
+            screen_width, screen_height = screen.get_size()
+            factor = min(screen_width // self.resolution[0], screen_height // self.resolution[1])
+
+            # A escala inteira só é possível quando a resolução interna cabe na tela
+            if self.scaling == "Integer" and factor >= 1:
+
+                size = (self.resolution[0] * factor, self.resolution[1] * factor)
+            else:
+
+                self.scaling = "Smooth"
+                ratio = min(screen_width / self.resolution[0], screen_height / self.resolution[1])
+                size = (int(self.resolution[0] * ratio), int(self.resolution[1] * ratio))
+
+            # A imagem fica centralizada e o restante da tela fica preto
+            self.destination = pygame.Rect((0, 0), size)
+            self.destination.center = screen.get_rect().center
+            self.screen.fill((0, 0, 0))
+
+        # A superfície da tela é redimensionada pelo pygame, então o tamanho anterior é guardado
+        previous_size = self.surface_size
+        self.surface_size = self.surface.get_size()
+
+        return self.surface_size != previous_size
+
+    def get_surface(self):
+        '''
+        Retorna a superfície onde o jogo é desenhado.
+        '''
+
+        return self.surface
+
+    def get_size(self):
+        '''
+        Retorna a resolução interna.
+        '''
+
+        return self.surface.get_size()
+
+    def is_scaled(self):
+        '''
+        Retorna verdadeiro caso a resolução interna seja diferente da tela.
+        '''
+
+        return self.surface is not self.screen
+
+    def set_smooth_filter(self, smooth_filter):
+        '''
+        Define se a escala suave usa filtragem. Sem filtragem a escala é feita pelo pixel mais
+        próximo, que custa bem menos.
+        '''
+
+        self.smooth_filter = smooth_filter
+
+    def has_vsync(self):
+        '''
+        Retorna falso, pois a atualização da tela por software não espera a sincronia vertical.
+        '''
+
+        return False
+
+    def supports_dirty_rects(self):
+        '''
+        Retorna verdadeiro, pois o conteúdo da superfície é mantido entre os frames.
+        '''
+
+        return True
+
+    def supports_render_thread(self):
+        '''
+        Retorna verdadeiro, pois a superfície pode ser desenhada e apresentada por outra thread.
+        '''
+
+        return True
+
+    def present(self, rects=None):
+        '''
+        Apresenta o frame na tela. Quando as regiões alteradas são informadas apenas elas são
+        escaladas e atualizadas. Na escala suave a imagem inteira é escalada para evitar emendas.
+        Depois de um redimensionamento a tela inteira é atualizada, incluindo as bordas.
+        '''
+
+        full_update = self.full_update
+        self.full_update = False
+
+        if full_update:
+
+            rects = None
+
+        if not self.is_scaled():
+
+            if rects is not None:
+
+                pygame.display.update(rects)
+            else:
+
+                pygame.display.update()
+        elif rects is None or self.scaling == "Smooth":
+
+            destination_surface = self.screen.subsurface(self.destination)
+
+            if self.scaling == "Smooth" and self.smooth_filter:
+
+                pygame.transform.smoothscale(self.surface,
+                                             self.destination.size,
+                                             destination_surface)
+            else:
+
+                pygame.transform.scale(self.surface, self.destination.size, destination_surface)
+
+            if full_update:
+
+                pygame.display.update()
+            else:
+
+                pygame.display.update(self.destination)
+        else:
+
+            factor = self.destination.width // self.surface.get_width()
+            screen_rects = []
+
+            for rect in rects:
+
+                rect = rect.clip(self.surface.get_rect())
+
+                if rect.width == 0 or rect.height == 0:
+
+                    continue
+
+                screen_rect = pygame.Rect(self.destination.x + rect.x * factor,
+                                          self.destination.y + rect.y * factor,
+                                          rect.width * factor,
+                                          rect.height * factor)
+
+                pygame.transform.scale(self.surface.subsurface(rect),
+                                       screen_rect.size,
+                                       self.screen.subsurface(screen_rect))
+
+                screen_rects.append(screen_rect)
+
+            pygame.display.update(screen_rects)
+
+    def map_position(self, position):
+        '''
+        Converte uma posição da tela para a resolução interna.
+        '''
+
+        scale_x = self.surface.get_width() / self.destination.width
+        scale_y = self.surface.get_height() / self.destination.height
+
+        return (int((position[0] - self.destination.x) * scale_x),
+                int((position[1] - self.destination.y) * scale_y))
+
+    def map_event(self, event):
+        '''
+        Converte a posição dos eventos do mouse para a resolução interna.
+        '''
+
+        if self.is_scaled() and hasattr(event, "pos"):
+
+            attributes = dict(event.dict)
+            attributes["pos"] = self.map_position(event.pos)
+
+            return pygame.event.Event(event.type, attributes)
+
+        return event
+
+
+class TextureCanvas():
+
+    '''
+    Alvo de desenho do renderizador acelerado. Imita a parte da interface de pygame.Surface usada
+    pelos sistemas (fill e blit), assim o mesmo código desenha nos dois renderizadores. Cada
+    superfície é enviada como textura na primeira vez que é desenhada. Superfícies modificadas depois
+    disso devem ser marcadas com TextureCanvas.touch para que a textura seja atualizada.
+    '''
+
+    versions: WeakKeyDictionary = WeakKeyDictionary()  # Versão do conteúdo das superfícies
+    renderer: Renderer  # Renderizador do SDL2
+    size: tuple  # Tamanho lógico
+    textures: WeakKeyDictionary  # Textura e versão de cada superfície
+
+    def __init__(self, renderer, size):
+
+        self.renderer = renderer
+        self.size = tuple(size)
+        self.textures = WeakKeyDictionary()
+
+    @staticmethod
+    def touch(surface):
+        '''
+        Marca que o conteúdo de uma superfície mudou.
+        '''
+
+        TextureCanvas.versions[surface] = TextureCanvas.versions.get(surface, 0) + 1
+
+    def get_texture(self, surface):
+        '''
+        Retorna a textura de uma superfície, enviando o conteúdo quando necessário.
+        '''
+
+        version = self.versions.get(surface, 0)
+        entry = self.textures.get(surface)
+
+        if entry is None:
+
+            entry = [Texture.from_surface(self.renderer, surface), version]
+            self.textures[surface] = entry
+        elif entry[1] != version:
+
+            entry[0].update(surface)
+            entry[1] = version
+
+        return entry[0]
+
+    def fill(self, color, rect=None, special_flags=0):
+        '''
+        Preenche uma região com uma cor. Sem região limpa o frame inteiro.
+        '''
+
+        if rect is None:
+
+            # Limpa também as bordas fora da área lógica
+            self.renderer.draw_color = (0, 0, 0, 255)
+            self.renderer.clear()
+            rect = self.get_rect()
+
+        self.renderer.draw_color = color
+        self.renderer.fill_rect(pygame.Rect(rect))
+
+        return pygame.Rect(rect).clip(self.get_rect())
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        '''
+        Desenha uma superfície através da sua textura.
+        '''
+
+        if area is not None:
+
+            area = pygame.Rect(area)
+            rect = pygame.Rect(dest[0], dest[1], area.width, area.height)
+        else:
+
+            rect = pygame.Rect((dest[0], dest[1]), source.get_size())
+
+        self.get_texture(source).draw(srcrect=area, dstrect=rect)
+
+        return rect.clip(self.get_rect())
+
+    def blits(self, blit_sequence, doreturn=True):
+        '''
+        Desenha uma sequência de superfícies.
+        '''
+
+        rects = [self.blit(*blit) for blit in blit_sequence]
+
+        return rects if doreturn else None
+
+    def get_size(self):
+        '''
+        Retorna o tamanho lógico.
+        '''
+
+        return self.size
+
+    def get_width(self):
+        '''
+        Retorna a largura lógica.
+        '''
+
+        return self.size[0]
+
+    def get_height(self):
+        '''
+        Retorna a altura lógica.
+        '''
+
+        return self.size[1]
+
+    def get_rect(self):
+        '''
+        Retorna o retângulo da área lógica.
+        '''
+
+        return pygame.Rect((0, 0), self.size)
+
+
+class HardwareRenderTarget():
+
+    '''
+    Superfície de renderização acelerada. Usa o Renderer do SDL2, que desenha as texturas pela GPU.
+    A resolução interna é definida pelo tamanho lógico do renderizador, que também converte as
+    posições do mouse.
+    '''
+
+    window: Window  # Janela
+    renderer: Renderer  # Renderizador
+    canvas: TextureCanvas  # Alvo de desenho
+    scaled: bool  # Define se a resolução interna é diferente da tela
+    vsync: bool  # Define se a apresentação espera a sincronia vertical
+
+    def __init__(self,
+                 resolution=None,
+                 scaling="Integer",
+                 vsync=False,
+                 window_size=None,
+                 resizable=False):
+
+        if Renderer is None:
+
+            raise pygame.error("O renderizador acelerado não está disponível")
+
+        # Define o filtro usado para escalar as texturas
+        environ["SDL_RENDER_SCALE_QUALITY"] = "0" if scaling == "Integer" else "1"
+
+        # O modo de vídeo oculto define o formato de pixel usado por convert e convert_alpha
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+
+        # Sem o tamanho da janela usa a tela cheia
+        if window_size is None:
+
+            self.window = Window("Frantic Flyers", fullscreen_desktop=True)
+        else:
+
+            self.window = Window("Frantic Flyers", tuple(window_size), resizable=resizable)
+
+        try:
+
+            self.renderer = Renderer(self.window, accelerated=1, vsync=vsync)
+        except RuntimeError:  # Erros do pygame e do módulo de SDL2
+
+            self.window.destroy()
+            raise
+
+        self.vsync = vsync
+        self.scaled = resolution is not None and tuple(resolution) != self.window.size
+
+        if self.scaled:
+
+            self.renderer.logical_size = tuple(resolution)
+        else:
+
+            resolution = self.window.size
+
+        self.canvas = TextureCanvas(self.renderer, resolution)
+
+    def get_surface(self):
+        '''
+        Retorna o alvo onde o jogo é desenhado.
+        '''
+
+        return self.canvas
+
+    def get_size(self):
+        '''
+        Retorna a resolução interna.
+        '''
+
+        return self.canvas.get_size()
+
+    def is_scaled(self):
+        '''
+        Retorna verdadeiro caso a resolução interna seja diferente da tela.
+        '''
+
+        return self.scaled
+
+    def resize(self):
+        '''
+        Ajusta a renderização ao tamanho atual da janela. Com o tamanho lógico o SDL faz a escala,
+        caso contrário a área de desenho passa a ter o tamanho da janela. Retorna verdadeiro caso o
+        tamanho onde o jogo é desenhado tenha mudado.
+        '''
+
+        if self.scaled or self.canvas.get_size() == self.window.size:
+
+            return False
+
+        self.canvas.size = self.window.size
+
+        return True
+
+    def set_smooth_filter(self, smooth_filter):
+        '''
+        A filtragem é definida na criação do renderizador e a escala é feita pela GPU, então não há
+        o que ajustar.
+        '''
+
+    def has_vsync(self):
+        '''
+        Retorna verdadeiro caso a apresentação espere a sincronia vertical.
+        '''
+
+        return self.vsync
+
+    def supports_dirty_rects(self):
+        '''
+        O renderizador acelerado redesenha o frame inteiro, pois o conteúdo anterior não é mantido.
+        '''
+
+        return False
+
+    def supports_render_thread(self):
+        '''
+        O renderizador do SDL deve ser usado apenas pela thread que o criou.
+        '''
+
+        return False
+
+    def present(self, rects=None):
+        '''
+        Apresenta o frame na tela.
+        '''
+
+        self.renderer.present()
+
+    def map_event(self, event):
+        '''
+        Os eventos já chegam convertidos para o tamanho lógico pelo SDL.
+        '''
+
+        return event
+
+
+class ParallaxBand():
+
+    '''
+    Faixa de parallax. As nuvens com a mesma velocidade são desenhadas uma vez em uma superfície
+    alta, que se repete na vertical e rola com a velocidade da faixa. Apenas as regiões da faixa
+    ocupadas por nuvens são desenhadas, exceto na faixa opaca do fundo.
+    '''
+
+    strip: pygame.Surface  # Superfície da faixa
+    speed: float  # Velocidade vertical
+    spans: list  # Regiões desenhadas, sem sobreposição, em coordenadas da faixa
+    cloud_spans: list  # Regiões ocupadas por nuvens, sem sobreposição, em coordenadas da faixa
+
+    def __init__(self, size, speed, clouds, background_color=None):
+
+        self.speed = speed
+        width, height = size
+
+        if background_color is not None:  # A faixa do fundo é opaca e inclui a cor do céu
+
+            self.strip = pygame.Surface(size).convert()
+            self.strip.fill(background_color)
+        else:
+
+            self.strip = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            self.strip.fill((0, 0, 0, 0))
+
+        rects = []
+
+        for image, position in clouds:
+
+            x = int(position[0])
+            y = int(position[1]) % height
+
+            # As nuvens que passam do fim da faixa continuam no início
+            self.strip.blit(image, (x, y))
+            self.strip.blit(image, (x, y - height))
+
+            rects.append(pygame.Rect(x, y, image.get_width(), min(image.get_height(), height - y)))
+
+            if y + image.get_height() > height:
+
+                rects.append(pygame.Rect(x, 0, image.get_width(), y + image.get_height() - height))
+
+        self.cloud_spans = self.merge_spans(rects, width)
+
+        if background_color is not None:
+
+            self.spans = [pygame.Rect(0, 0, width, height)]
+        else:
+
+            self.spans = self.cloud_spans
+
+    @staticmethod
+    def merge_spans(rects, width):
+        '''
+        Junta os retângulos em faixas horizontais sem sobreposição, assim nenhum pixel é desenhado
+        duas vezes.
+        '''
+
+        spans = []
+
+        for rect in sorted(rects, key=lambda rect: rect.top):
+
+            rect = rect.clip(pygame.Rect(0, rect.top, width, rect.height))
+
+            if rect.width == 0:
+
+                continue
+
+            if spans and rect.top < spans[-1].bottom:
+
+                spans[-1].union_ip(rect)
+            else:
+
+                spans.append(rect)
+
+        return spans
+
+    def get_windows(self, screen_height, offset, spans):
+        '''
+        Retorna as partes visíveis das regiões, como pares do retângulo na tela e do topo na faixa.
+        A janela visível pode passar do fim da faixa, sendo dividida em duas partes.
+        '''
 
+        height = self.strip.get_height()
+        top = int(-offset) % height
 
-class GraphicsManager():
+        # Partes da faixa (início, fim e posição na tela)
+        pieces = [(top, min(top + screen_height, height), 0)]
+
+        if top + screen_height > height:
+
+            pieces.append((0, top + screen_height - height, height - top))
+
+        windows = []
+
+        for start, end, screen_y in pieces:
+
+            for span in spans:
+
+                span_top = max(start, span.top)
+                span_bottom = min(end, span.bottom)
+
+                if span_top < span_bottom:
+
+                    windows.append((pygame.Rect(span.x,
+                                                screen_y + span_top - start,
+                                                span.width,
+                                                span_bottom - span_top),
+                                    span_top))
+
+        return windows
+
+    def render(self, display, offset, region=None):
+        '''
+        Desenha a janela visível da faixa. Com uma região desenha apenas dentro dela.
+        '''
+
+        for rect, strip_top in self.get_windows(display.get_height(), offset, self.spans):
+
+            if region is not None:
+
+                clipped_rect = rect.clip(region)
+
+                if clipped_rect.width == 0 or clipped_rect.height == 0:
+
+                    continue
+
+                strip_top += clipped_rect.y - rect.y
+                rect = clipped_rect
+
+            display.blit(self.strip, rect, (rect.x, strip_top, rect.width, rect.height))
+
+    def get_cloud_rects(self, screen_height, offset):
+        '''
+        Retorna as regiões da tela ocupadas pelas nuvens da faixa.
+        '''
+
+        return [rect for rect, _ in self.get_windows(screen_height, offset, self.cloud_spans)]
+
+
+class ParallaxCompositor():
 
     '''
-    Gerencia os graficos durante o gameplay.
+    Compositor do plano de fundo. O campo de nuvens é desenhado uma vez em uma faixa por velocidade.
+    A cada frame apenas a janela visível de cada faixa é desenhada, no lugar de preencher a tela e
+    desenhar cada nuvem com transparência. Fora das nuvens o céu tem cor uniforme, então apenas as
+    regiões das nuvens mudam entre os frames.
     '''
 
-    render_group: pygame.sprite.RenderPlain  # Grupo de sprites
-    background_color: pygame.color.Color  # Cor do plano de fundo
+    background_color: tuple  # Cor do céu
+    clouds: list  # Imagem, posição e velocidade de cada nuvem
+    bands: list  # Faixas, da mais lenta (fundo) para a mais rápida
+    offsets: list  # Deslocamento vertical de cada faixa
+    previous_rects: list  # Regiões da tela ocupadas pelas nuvens no último frame
 
-    def __init__(self, background_color):
+    def __init__(self, screen_size, background_color, clouds):
 
-        self.render_group = pygame.sprite.RenderPlain()
-        self.background_color = pygame.color.Color(background_color)
+        self.background_color = background_color
+        self.clouds = clouds
+        self.bands = []
+        self.offsets = []
+        self.previous_rects = []
 
-    def update(self, state, display, entities):
+        self.resize(screen_size)
+
+    def resize(self, screen_size):
         '''
-        Atualiza os gráficos.
+        Desenha as faixas para um tamanho de tela. As nuvens mantêm as posições e os deslocamentos
+        são mantidos dentro da nova altura das faixas.
         '''
 
-        if state == State.GAMEPLAY:  # Se for o gameplay
+        # As faixas repetem a cada duas telas, ou mais caso uma nuvem seja maior que a tela
+        largest_cloud = max([image.get_height() for image, _, _ in self.clouds], default=0)
+        size = (screen_size[0], screen_size[1] + max(screen_size[1], largest_cloud))
+
+        # Agrupa as nuvens pela velocidade
+        speed_bands = {}
+
+        for image, position, speed in self.clouds:
+
+            speed_bands.setdefault(speed, []).append((image, position))
+
+        if not speed_bands:
+
+            speed_bands[0.0] = []
+
+        speeds = sorted(speed_bands)
+
+        # As nuvens maiores são mais lentas e ficam por trás. A faixa mais lenta é opaca
+        self.bands = [ParallaxBand(size,
+                                   speed,
+                                   speed_bands[speed],
+                                   self.background_color if speed == speeds[0] else None)
+                      for speed in speeds]
+
+        if len(self.offsets) != len(self.bands):
+
+            self.offsets = [0.0] * len(self.bands)
+
+        self.offsets = [offset % size[1] for offset in self.offsets]
+        self.previous_rects = []
+
+    def update(self, tick):
+        '''
+        Move as faixas. Usa a mesma integração da física.
+        '''
+
+        for i, band in enumerate(self.bands):
+
+            self.offsets[i] = (self.offsets[i] + band.speed / tick) % band.strip.get_height()
+
+    def get_offsets(self):
+        '''
+        Retorna uma cópia dos deslocamentos das faixas.
+        '''
+
+        return list(self.offsets)
+
+    def render(self, display, offsets=None):
+        '''
+        Desenha o plano de fundo na tela inteira.
+        '''
+
+        if offsets is None:
+
+            offsets = self.offsets
+
+        for band, offset in zip(self.bands, offsets):
+
+            band.render(display, offset)
+
+    def render_region(self, display, rect):
+        '''
+        Redesenha o plano de fundo dentro de uma região. Todas as faixas são desenhadas em cada
+        região, assim regiões sobrepostas não misturam a transparência duas vezes.
+        '''
+
+        for band, offset in zip(self.bands, self.offsets):
+
+            band.render(display, offset, rect)
+
+    def get_dirty_rects(self, screen_height):
+        '''
+        Retorna as regiões das nuvens no último frame e no atual, que são as únicas regiões do
+        plano de fundo que mudam quando as faixas se movem.
+        '''
+
+        rects = []
+
+        for band, offset in zip(self.bands, self.offsets):
+
+            rects += band.get_cloud_rects(screen_height, offset)
+
+        dirty_rects = self.previous_rects + rects
+        self.previous_rects = rects
+
+        return dirty_rects
+
+
+class FrameSnapshot():
+
+    '''
+    Cópia do estado necessário para desenhar um frame. Depois de entregue ao pipeline pertence à
+    thread de renderização e não é mais modificada pela simulação.
+    '''
+
+    state: State  # Estado do jogo
+    sprites: list  # Pares de imagem e retângulo na ordem das camadas
+    background: ParallaxCompositor  # Plano de fundo composto. As faixas não são modificadas
+    background_offsets: list  # Deslocamento das faixas do plano de fundo
+    modification_data: dict  # Dados dos modificadores
+    score: int  # Pontuação
+    life: float  # Vida do jogador
+
+    def __init__(self, state, render_group, modification_data, score, life, background=None):
+
+        self.state = state
+        self.sprites = []
+        self.background = background
+        self.background_offsets = None
+        self.modification_data = dict(modification_data)
+        self.score = score
+        self.life = life
+
+        if state == State.GAMEPLAY:
+
+            # As imagens vêm do cache e não são modificadas, apenas os retângulos são copiados
+            self.sprites = [(sprite.image, sprite.rect.copy())
+                            for sprite in render_group.get_visible_sprites()]
+
+            if background is not None:
+
+                self.background_offsets = background.get_offsets()
+
+
+class RenderPipeline():
+
+    '''
+    Pipeline de renderização. A simulação do frame N + 1 roda na thread principal enquanto uma
+    thread de renderização desenha e apresenta o frame N. Regras de posse:
+
+    - A thread principal é dona das entidades, da física e dos eventos do pygame. A cada frame ela
+    entrega uma cópia do estado e não a acessa mais.
+    - A thread de renderização é dona do display e dos elementos da interface, que são atualizados
+    a partir da cópia. A thread principal apenas lê a geometria dos botões, que não muda.
+
+    No máximo dois frames ficam em uso ao mesmo tempo: um sendo desenhado e outro aguardando.
+    '''
+
+    render_target: RenderTarget  # Superfície de renderização
+    graphics: GraphicsManager  # Sistema gráfico
+    user_interface: None  # Sistema de interface
+    snapshots: Queue  # Frame aguardando a renderização
+    thread: Thread  # Thread de renderização
+    error: Exception  # Erro ocorrido na thread de renderização
+
+    def __init__(self, render_target, graphics, user_interface):
+
+        self.render_target = render_target
+        self.graphics = graphics
+        self.user_interface = user_interface
+        self.snapshots = Queue(maxsize=1)
+        self.error = None
+
+        self.thread = Thread(target=self.run, name="Render", daemon=True)
+        self.thread.start()
+
+    def submit(self, snapshot):
+        '''
+        Entrega um frame para a renderização. Espera caso a renderização esteja um frame atrasada.
+        '''
+
+        if self.error is not None:
+
+            raise self.error
+
+        self.snapshots.put(snapshot)
+
+    def run(self):
+        '''
+        Laço da thread de renderização.
+        '''
+
+        display = self.render_target.get_surface()
+
+        while True:
+
+            snapshot = self.snapshots.get()
+
+            if snapshot is None:  # Pedido de encerramento
+
+                break
+
+            if self.error is not None:  # Após um erro os frames são descartados
+
+                continue
+
+            try:
+
+                self.graphics.render_snapshot(display, snapshot)
+                self.user_interface.render(snapshot.state,
+                                           display,
+                                           snapshot.modification_data,
+                                           snapshot.score,
+                                           snapshot.life)
+                self.render_target.present()
+            except Exception as error:  # O erro é repassado para a thread principal
+
+                self.error = error
+
+    def stop(self):
+        '''
+        Encerra a thread de renderização após o último frame entregue. Um erro ocorrido nos últimos
+        frames é repassado para a thread principal.
+        '''
+
+        self.snapshots.put(None)
+        self.thread.join()
+
+        if self.error is not None:
+
+            raise self.error
+
+
+class SurfaceCache():
+
+    '''
+    Cache de superfícies compartilhadas. Quando a memória ocupada passa do limite, as superfícies
+    usadas há mais tempo são descartadas (LRU). As superfícies do cache não devem ser modificadas.
+    O acesso é protegido por uma trava, pois a thread de renderização também usa o cache.
+    '''
+
+    lock: Lock  # Trava de acesso
+    surfaces: OrderedDict  # Superfícies em ordem de uso
+    memory_budget: int  # Limite de memória em bytes
+    memory_usage: int  # Memória ocupada em bytes
+    hits: int  # Acessos encontrados no cache
+    misses: int  # Acessos que geraram uma nova superfície
+    evictions: int  # Superfícies descartadas
+
+    def __init__(self, memory_budget):
 
-            display.fill(self.background_color)  # Preenche a tela com a cor do plano de fundo
+        self.lock = Lock()
+        self.surfaces = OrderedDict()
+        self.memory_budget = memory_budget
+        self.memory_usage = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
-            # Adiciona o sprite de cada entidade no grupo de sprites
-            for entity in entities:
+    def get_surface(self, key, build):
+        '''
+        Retorna a superfície da chave. Caso ela não esteja no cache é criada pela função "build".
+        '''
+
+        with self.lock:
+
+            surface = self.surfaces.get(key)
+
+            if surface is not None:
+
+                self.hits += 1
+                self.surfaces.move_to_end(key)  # Marca como a mais recente
+            else:
+
+                self.misses += 1
+                surface = build()
+
+                self.surfaces[key] = surface
+                self.memory_usage += self.get_surface_memory(surface)
+
+                # Descarta as superfícies menos usadas. A mais recente sempre fica no cache
+                while self.memory_usage > self.memory_budget and len(self.surfaces) > 1:
+
+                    _, evicted_surface = self.surfaces.popitem(last=False)
+                    self.memory_usage -= self.get_surface_memory(evicted_surface)
+                    self.evictions += 1
+
+        return surface
+
+    @staticmethod
+    def get_surface_memory(surface):
+        '''
+        Retorna a memória ocupada pelos pixels de uma superfície.
+        '''
+
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def set_memory_budget(self, memory_budget):
+        '''
+        Define o limite de memória. O excesso é descartado no próximo acesso que gerar uma superfície.
+        '''
+
+        self.memory_budget = memory_budget
+
+    def clear(self):
+        '''
+        Limpa o cache.
+        '''
+
+        with self.lock:
+
+            self.surfaces.clear()
+            self.memory_usage = 0
+
+    def get_statistics(self):
+        '''
+        Retorna as estatísticas do cache.
+        '''
+
+        return {"Hits": self.hits,
+                "Misses": self.misses,
+                "Evictions": self.evictions,
+                "Entries": len(self.surfaces),
+                "Memory": self.memory_usage,
+                "Memory Budget": self.memory_budget}
+
+
+class BlitModeOptimizer():
+
+    '''
+    Preparação das superfícies para o desenho. Analisa o canal alfa e escolhe o modo mais barato
+    que mantém a mesma imagem: superfície opaca, cor chave com RLE (quando o alfa é apenas 0 ou 255)
+    ou transparência por pixel.
+    '''
+
+    # Cores chave candidatas, usadas caso não apareçam na imagem
+    colorkeys: tuple = ((255, 0, 255), (0, 255, 0), (1, 2, 3), (254, 1, 253))
+
+    @staticmethod
+    def classify(surface):
+        '''
+        Retorna o modo de desenho mais barato para a superfície.
+        '''
+
+        if not surface.get_flags() & pygame.SRCALPHA:
+
+            return BlitMode.COLORKEY if surface.get_colorkey() is not None else BlitMode.OPAQUE
+
+        area = surface.get_width() * surface.get_height()
+        opaque_pixels = pygame.mask.from_surface(surface, 254).count()  # Alfa igual a 255
+
+        if opaque_pixels == area:
+
+            return BlitMode.OPAQUE
+
+        visible_pixels = pygame.mask.from_surface(surface, 0).count()  # Alfa maior que 0
+
+        if visible_pixels == opaque_pixels:
+
+            return BlitMode.COLORKEY
+
+        return BlitMode.ALPHA
+
+    @staticmethod
+    def find_colorkey(surface):
+        '''
+        Retorna uma cor chave que não aparece nas partes visíveis da superfície. Retorna None caso
+        todas as candidatas apareçam.
+        '''
+
+        visible = pygame.mask.from_surface(surface, 0)
+
+        for colorkey in BlitModeOptimizer.colorkeys:
+
+            matches = pygame.mask.from_threshold(surface, colorkey, (1, 1, 1, 255))
+
+            if matches.overlap_area(visible, (0, 0)) == 0:
+
+                return colorkey
+
+        return None
+
+    @staticmethod
+    def prepare(surface):
+        '''
+        Retorna uma cópia da superfície no formato do seu modo de desenho. A superfície retornada não
+        deve ser modificada depois, pois pode estar codificada com RLE.
+        '''
+
+        blit_mode = BlitModeOptimizer.classify(surface)
+
+        if blit_mode == BlitMode.OPAQUE:
+
+            return surface.convert()
+
+        if blit_mode == BlitMode.COLORKEY and surface.get_flags() & pygame.SRCALPHA:
+
+            colorkey = BlitModeOptimizer.find_colorkey(surface)
+
+            if colorkey is None:
 
-                self.render_group.add(entity.get_sprite())
+                return surface.convert_alpha()
 
-            self.render_group.draw(display)  # Renderiza o grupo de sprites
-            self.render_group.empty()  # Limpa o grupo de sprites
+            # Os pixels transparentes recebem a cor chave e os visíveis são copiados
+            prepared_surface = pygame.Surface(surface.get_size()).convert()
+            prepared_surface.fill(colorkey)
+            prepared_surface.blit(surface, (0, 0))
+            prepared_surface.set_colorkey(colorkey, pygame.RLEACCEL)
+
+            return prepared_surface
+
+        if blit_mode == BlitMode.COLORKEY:
+
+            surface = surface.convert()
+            surface.set_colorkey(surface.get_colorkey(), pygame.RLEACCEL)
+
+            return surface
+
+        return surface  # As superfícies com transparência por pixel já estão no formato do display
+
+
+class TransformCache(SurfaceCache):
+
+    '''
+    Cache de superfícies transformadas. Sprites com a mesma imagem, tamanho, ângulo e cor
+    compartilham a mesma superfície. As superfícies geradas passam pelo otimizador de modo de desenho.
+    '''
+
+    optimize_blit_mode: bool = True  # Define se as superfícies são preparadas para o desenho
+
+    def get_transformed(self, image, size, angle=0.0, color=None, smooth=False):
+        '''
+        Retorna a imagem escalada e rotacionada. Sem imagem, retorna um retângulo com a cor.
+        '''
+
+        size = (int(size[0]), int(size[1]))
+
+        if color is not None:
+
+            color = tuple(pygame.color.Color(color))
+
+        def build():
+
+            if image is not None:
+
+                if smooth:
+
+                    surface = pygame.transform.smoothscale(image, size)
+                else:
+
+                    surface = pygame.transform.scale(image, size)
+
+                if angle != 0:
+
+                    surface = pygame.transform.rotate(surface, angle)
+            else:
+
+                surface = pygame.Surface(size)
+
+            if color is not None:  # Preenche com uma cor caso tenha
+
+                surface.fill(color)
+
+            if self.optimize_blit_mode:
+
+                surface = BlitModeOptimizer.prepare(surface)
+
+            return surface
+
+        return self.get_surface((image, size, angle, color, smooth), build)
 
 
 class CustomSprite(pygame.sprite.Sprite):
 
     '''
-    Define um sprite.
+    Define um sprite. As imagens transformadas são compartilhadas entre os sprites e não devem ser
+    modificadas.
     '''
 
+    transform_cache: TransformCache = TransformCache(128 * 1024 * 1024)  # Cache compartilhado
+    source: pygame.Surface  # Imagem original
+    color: tuple  # Cor do retângulo
+    angle: float  # Ângulo
+
     def __init__(self, position, size, image=None, color=None, angle=0.0):
 
         super().__init__()
 
-        # Carrega uma imagem se tiver ou desenha um retângulo
-        if image is not None:
-
-            self.image = pygame.transform.scale(image, size)
-            self.image = pygame.transform.rotate(self.image, angle)
-        else:
+        self.source = image
+        self.color = color
+        self.angle = angle
 
-            self.image = pygame.Surface(size)
+        # Carrega uma imagem se tiver ou desenha um retângulo
+        self.image = self.transform_cache.get_transformed(image, size, angle, color)
 
         # Define os atributos do sprite
         self.rect = self.image.get_rect()
         self.rect.x = position[0]
         self.rect.y = position[1]
 
-        if color is not None:  # Preenche com uma cor caso tenha
-
-            self.image.fill(color)
-
     def update(self, position, size=None):
         '''
         Redefine a posição e tamanho do sprite.
@@ -76,63 +1564,108 @@ class CustomSprite(pygame.sprite.Sprite):
 
         if size is not None:
 
-            self.image = pygame.transform.scale(self.image, size)
+            # A imagem é gerada a partir da original, assim não perde qualidade
+            self.image = self.transform_cache.get_transformed(self.source,
+                                                              size,
+                                                              self.angle,
+                                                              self.color)
 
         self.rect.x = int(position[0])
         self.rect.y = int(position[1])
 
 
+class AnimationClock():
+
+    '''
+    Relógio compartilhado pelas animações. Apenas o relógio avança a cada frame, cada sprite calcula
+    a própria imagem a partir do tempo decorrido desde o início da sua animação.
+    '''
+
+    time: float  # Tempo de reprodução em segundos
+    max_step: float  # Avanço máximo por frame em segundos
+
+    def __init__(self, max_step=0.1):
+
+        self.time = 0.0
+        self.max_step = max_step
+
+    def advance(self, delta_time):
+        '''
+        Avança o relógio pelo tempo medido do frame. O avanço é limitado, assim uma espera longa,
+        como um travamento da janela, não termina todas as animações de uma vez.
+        '''
+
+        self.time += min(delta_time, self.max_step)
+
+    def get_time(self):
+        '''
+        Retorna o tempo de reprodução.
+        '''
+
+        return self.time
+
+
 class CustomAnimatedSprite(pygame.sprite.Sprite):
 
     '''
-    Sprite que pode ser animado.
+    Sprite que pode ser animado. A imagem é escolhida pelo tempo decorrido, então a velocidade da
+    animação não depende da taxa de frames e imagens são puladas quando o jogo está atrasado.
     '''
 
+    clock: AnimationClock = AnimationClock()  # Relógio compartilhado pelas animações
     images: list  # Imagens
-    animating: bool  # Define se está animando ou não
-    step: int  # Frame da animação
+    start_time: float  # Início da animação. None quando não foi iniciada
+    duration: float  # Duração da animação em segundos
 
     def __init__(self, position, size, image_list):
 
         super().__init__()
 
         self.images = []
-        self.animating = False
-        self.step = 0
+        self.start_time = None
+        self.duration = 0.0
 
         for image in image_list:
-            self.images.append(pygame.transform.scale(image, size))
+            self.images.append(CustomSprite.transform_cache.get_transformed(image, size))
 
         # Define os atributos do sprite
-        self.image = self.images[0]
-        self.rect = self.image.get_rect()
+        self.rect = self.images[0].get_rect()
         self.rect.x = position[0]
         self.rect.y = position[1]
 
-    def start_animation(self):
+    @property
+    def image(self):
         '''
-        Inicia a animação.
+        Imagem do tempo atual. É calculada apenas quando o sprite é desenhado.
         '''
 
-        self.animating = True
+        if self.start_time is None:
 
-    def animate_frame(self):
-        '''
-        Anima um frame. Troca a imagem atual caso a animação ainda não tenha acabado.
-        '''
+            return self.images[0]
 
-        if self.animating and self.step < len(self.images):
+        elapsed_time = self.clock.get_time() - self.start_time
 
-            self.image = self.images[self.step]
-            self.step += 1
-        else:
+        # A tolerância compensa o erro de arredondamento acumulado pelo relógio
+        index = int(elapsed_time / self.duration * len(self.images) + 1e-6)
+
+        return self.images[min(max(index, 0), len(self.images) - 1)]
+
+    def start_animation(self, duration):
+        '''
+        Inicia a animação com a duração em segundos.
+        '''
 
-            self.step = 0
-            self.animating = False
+        self.start_time = self.clock.get_time()
+        self.duration = duration
 
     def is_animating(self):
         '''
         Retorna verdadeiro caso o sprite esteja sendo animado.
         '''
 
-        return self.animating
+        if self.start_time is None:
+
+            return False
+
+        # Usa a mesma tolerância da escolha da imagem
+        return self.clock.get_time() - self.start_time < self.duration - 1e-6
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+'''
+Módulo para o controle do ritmo dos frames.
+'''
+
+from collections import deque
+from time import perf_counter, sleep
+
+
+class FramePacer():
+
+    '''
+    Controla o ritmo dos frames. Substitui o clock do pygame, cuja espera depende da granularidade
+    do sleep do sistema. O pacer dorme até pouco antes do prazo do frame e completa a espera
+    verificando o relógio de alta resolução. Os prazos são absolutos, assim o atraso de um frame
+    não se acumula nos seguintes.
+    '''
+
+    frame_period: float  # Duração alvo de um frame em segundos
+    spin_time: float  # Parte final da espera feita sem dormir
+    vsync: bool  # Define se a apresentação já espera a sincronia vertical
+    deadline: float  # Prazo do próximo frame
+    last_frame: float  # Momento em que o último frame terminou
+    frame_times: deque  # Duração dos últimos frames em milissegundos
+    frame_count: int  # Frames medidos
+    missed_deadlines: int  # Frames que terminaram depois do prazo
+
+    def __init__(self, frame_rate, spin_time=0.002, vsync=False, history=600):
+
+        self.frame_period = 1.0 / frame_rate
+        self.spin_time = spin_time
+        self.vsync = vsync
+        self.deadline = None
+        self.last_frame = None
+        self.frame_times = deque(maxlen=history)
+        self.frame_count = 0
+        self.missed_deadlines = 0
+
+    def tick(self):
+        '''
+        Espera o prazo do frame e retorna a duração do frame em milissegundos, como o clock do
+        pygame. Com a sincronia vertical a espera é feita pela apresentação e o pacer apenas mede.
+        '''
+
+        now = perf_counter()
+
+        if self.deadline is None:  # Primeiro frame
+
+            self.deadline = now
+        elif not self.vsync:
+
+            self.deadline += self.frame_period
+
+            if now > self.deadline:  # O trabalho do frame passou do prazo
+
+                self.missed_deadlines += 1
+
+                # Com mais de um frame de atraso o ritmo recomeça, no lugar de correr para alcançar
+                if now - self.deadline > self.frame_period:
+
+                    self.deadline = now
+            else:
+
+                self.wait(self.deadline)
+        elif now - self.last_frame > self.frame_period * 1.5:  # Perdeu pelo menos uma sincronia
+
+            self.missed_deadlines += 1
+
+        now = perf_counter()
+        frame_time = 0.0
+
+        if self.last_frame is not None:
+
+            frame_time = (now - self.last_frame) * 1000.0
+            self.frame_times.append(frame_time)
+            self.frame_count += 1
+
+        self.last_frame = now
+
+        return frame_time
+
+    def set_frame_rate(self, frame_rate):
+        '''
+        Define a taxa de frames alvo.
+        '''
+
+        self.frame_period = 1.0 / frame_rate
+
+    def reset(self):
+        '''
+        Recomeça o ritmo. Usado depois de uma espera longa fora do pacer, que não deve contar como
+        um frame atrasado.
+        '''
+
+        self.deadline = None
+        self.last_frame = None
+
+    def wait(self, deadline):
+        '''
+        Espera até o prazo. Dorme enquanto houver folga e verifica o relógio no final. O sleep(0)
+        libera o GIL para a thread de renderização durante a verificação.
+        '''
+
+        remaining = deadline - perf_counter() - self.spin_time
+
+        if remaining > 0.0:
+
+            sleep(remaining)
+
+        while perf_counter() < deadline:
+
+            sleep(0)
+
+    def get_percentile(self, percentile):
+        '''
+        Retorna o percentil da duração dos últimos frames em milissegundos.
+        '''
+
+        if len(self.frame_times) == 0:
+
+            return 0.0
+
+        frame_times = sorted(self.frame_times)
+        index = min(int(len(frame_times) * percentile / 100.0), len(frame_times) - 1)
+
+        return frame_times[index]
+
+    def get_histogram(self, bin_size=1.0):
+        '''
+        Retorna o histograma da duração dos últimos frames. As chaves são o início de cada faixa em
+        milissegundos.
+        '''
+
+        histogram = {}
+
+        for frame_time in self.frame_times:
+
+            frame_bin = int(frame_time // bin_size) * bin_size
+            histogram[frame_bin] = histogram.get(frame_bin, 0) + 1
+
+        return dict(sorted(histogram.items()))
+
+    def get_statistics(self):
+        '''
+        Retorna as estatísticas do ritmo dos frames.
+        '''
+
+        return {"Frames": self.frame_count,
+                "Missed": self.missed_deadlines,
+                "P50": self.get_percentile(50),
+                "P95": self.get_percentile(95),
+                "P99": self.get_percentile(99)}
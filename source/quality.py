@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+'''
+Módulo para o ajuste automático da qualidade.
+'''
+
+
+class QualityGovernor():
+
+    '''
+    Ajusta o nível de qualidade com base no tempo dos frames. O tempo de trabalho de cada frame, sem
+    a espera do clock, é comparado com o tempo disponível. As mudanças têm histerese: a qualidade
+    cai após uma janela lenta, mas só sobe após várias janelas seguidas com folga, e cada mudança é
+    seguida por um intervalo sem medições.
+    '''
+
+    # Alavancas de cada nível, do mais leve para o mais pesado. O nível 2 é o padrão
+    levels: tuple = ({"Small Explosions": 2,
+                      "Clouds": 4,
+                      "Effect Density": 0.25,
+                      "Smooth Filter": False,
+                      "Sound Channels": 4},
+                     {"Small Explosions": 3,
+                      "Clouds": 7,
+                      "Effect Density": 0.5,
+                      "Smooth Filter": False,
+                      "Sound Channels": 6},
+                     {"Small Explosions": 5,
+                      "Clouds": 10,
+                      "Effect Density": 1.0,
+                      "Smooth Filter": True,
+                      "Sound Channels": 8},
+                     {"Small Explosions": 10,
+                      "Clouds": 14,
+                      "Effect Density": 1.0,
+                      "Smooth Filter": True,
+                      "Sound Channels": 16})
+
+    level: int  # Nível atual
+    window: int  # Frames por janela de medição
+    frame_times: list  # Tempos de trabalho da janela atual
+    upper_load: float  # Carga que reduz a qualidade
+    lower_load: float  # Carga que permite aumentar a qualidade
+    headroom_windows: int  # Janelas seguidas com folga
+    required_headroom_windows: int  # Janelas com folga necessárias para aumentar a qualidade
+    cooldown: int  # Frames restantes sem medições após uma mudança
+    frame_count: int  # Frames medidos
+    transitions: list  # Mudanças de nível (frame, nível anterior, novo nível, carga)
+
+    def __init__(self,
+                 level=2,
+                 window=60,
+                 upper_load=0.9,
+                 lower_load=0.5,
+                 required_headroom_windows=3):
+
+        self.level = min(max(level, 0), len(self.levels) - 1)
+        self.window = window
+        self.frame_times = []
+        self.upper_load = upper_load
+        self.lower_load = lower_load
+        self.headroom_windows = 0
+        self.required_headroom_windows = required_headroom_windows
+        self.cooldown = 0
+        self.frame_count = 0
+        self.transitions = []
+
+    def update(self, frame_time, frame_budget):
+        '''
+        Registra o tempo de trabalho de um frame. Retorna verdadeiro caso o nível tenha mudado.
+        '''
+
+        self.frame_count += 1
+
+        if self.cooldown > 0:  # Espera os sistemas se ajustarem ao novo nível
+
+            self.cooldown -= 1
+            return False
+
+        self.frame_times.append(frame_time)
+
+        if len(self.frame_times) < self.window:
+
+            return False
+
+        load = sum(self.frame_times) / len(self.frame_times) / frame_budget
+        self.frame_times.clear()
+
+        if load > self.upper_load:  # Sem tempo sobrando reduz a qualidade
+
+            self.headroom_windows = 0
+            return self.set_level(self.level - 1, load)
+
+        if load < self.lower_load:  # Com folga a qualidade aumenta após algumas janelas
+
+            self.headroom_windows += 1
+
+            if self.headroom_windows >= self.required_headroom_windows:
+
+                self.headroom_windows = 0
+                return self.set_level(self.level + 1, load)
+        else:
+
+            self.headroom_windows = 0
+
+        return False
+
+    def set_level(self, level, load=None):
+        '''
+        Muda o nível e registra a mudança. Retorna verdadeiro caso o nível tenha mudado.
+        '''
+
+        level = min(max(level, 0), len(self.levels) - 1)
+
+        if level == self.level:
+
+            return False
+
+        self.transitions.append((self.frame_count, self.level, level, load))
+        self.level = level
+        self.cooldown = self.window * 2
+        self.frame_times.clear()
+
+        return True
+
+    def get_level(self):
+        '''
+        Retorna o nível atual.
+        '''
+
+        return self.level
+
+    def get_settings(self):
+        '''
+        Retorna as alavancas do nível atual.
+        '''
+
+        return self.levels[self.level]
+
+    def get_transitions(self):
+        '''
+        Retorna as mudanças de nível.
+        '''
+
+        return self.transitions
@@ -4,12 +4,14 @@
 Módulo para o sistema de interfaces.
 '''
 
+from collections import OrderedDict
 from enum import Enum
 from os.path import join
+from threading import Lock
 
 import pygame
 
-from source.graphics import CustomSprite
+from source.graphics import CustomSprite, SurfaceCache, TextureCanvas
 from source.states import Event, State
 from source.file_system import AssetContainer
 
@@ -21,76 +23,227 @@ class UserInterfaceManager():
     '''
 
     user_interface_event: Event  # Evento
+    dirty_rects: list  # Regiões alteradas pela interface. None indica a tela inteira
+    retained_display: bool  # Define se o display mantém o conteúdo entre os frames
+    previous_state: State  # Estado renderizado no último frame
     asset_container: AssetContainer
-    main_menu: None  # Menu principal
-    modification_menu: None  # Menu de modificação
-    gameplay_interface: None  # Interface do gameplay
-    pause_interface: None  # Pause
-    gameover_interface: None  # Fim de jogo
+    screen_size: tuple  # Tamanho da tela
+    version: str  # Versão mostrada no menu principal
+    lock: Lock  # Trava da construção das interfaces
+    interfaces: OrderedDict  # Interfaces construídas por estado, em ordem de uso
+    memory_budget: int  # Limite de memória das interfaces em bytes. None sem limite
+    prebuild_queue: list  # Estados com interfaces a serem pré-construídas
     sound: pygame.mixer.Sound  # Som
 
-    def __init__(self, screen_size, version, asset_container):
+    def __init__(self, screen_size, version, asset_container, memory_budget=None):
 
         self.user_interface_event = None
+        self.dirty_rects = None
+        self.retained_display = False
+        self.previous_state = None
         self.asset_container = asset_container
-        self.main_menu = MainMenu(screen_size, version, (92, 184, 230), self.asset_container)
-        self.modification_menu = ModificationMenu(screen_size, (92, 184, 230), self.asset_container)
-        self.gameplay_interface = GameplayInterface(screen_size, (0, 0, 0, 0))
-        self.pause_interface = PauseInterface(screen_size, (92, 184, 230), self.asset_container)
-        self.gameover_interface = GameoverInterface(screen_size, (92, 184, 230), self.asset_container)
+        self.screen_size = screen_size
+        self.version = version
+        self.lock = Lock()
+        self.interfaces = OrderedDict()
+        self.memory_budget = memory_budget
+        self.prebuild_queue = [State.MODIFICATION_MENU,
+                               State.GAMEPLAY,
+                               State.PAUSE,
+                               State.GAMEOVER]
+
+        Text.font_registry.preload((15, 25, 30, 40, 50, 80))  # Tamanhos usados pelas interfaces
+
         self.sound = self.asset_container.get_audio("SFX", "Selection.wav")
 
+    def build_interface(self, state):
+        '''
+        Constrói a interface de um estado. Retorna None para os estados sem interface.
+        '''
+
+        if state == State.MAIN_MENU:
+
+            return MainMenu(self.screen_size, self.version, (92, 184, 230), self.asset_container)
+        elif state == State.MODIFICATION_MENU:
+
+            return ModificationMenu(self.screen_size, (92, 184, 230), self.asset_container)
+        elif state == State.GAMEPLAY:
+
+            return GameplayInterface(self.screen_size, (0, 0, 0, 0))
+        elif state == State.PAUSE:
+
+            return PauseInterface(self.screen_size, (92, 184, 230), self.asset_container)
+        elif state == State.GAMEOVER:
+
+            return GameoverInterface(self.screen_size, (92, 184, 230), self.asset_container)
+
+        return None
+
+    def get_interface(self, state):
+        '''
+        Retorna a interface de um estado. A interface é construída no primeiro uso. A trava impede
+        que a simulação e a thread de renderização construam a mesma interface.
+        '''
+
+        with self.lock:
+
+            interface = self.interfaces.get(state)
+
+            if interface is not None:
+
+                self.interfaces.move_to_end(state)  # Marca como a mais recente
+            else:
+
+                interface = self.build_interface(state)
+
+                if interface is not None:
+
+                    self.interfaces[state] = interface
+
+        return interface
+
+    def prebuild(self):
+        '''
+        Constrói a próxima interface da fila de pré-construção. Feito para ser chamado uma vez por
+        frame enquanto o menu principal é mostrado, o que distribui a construção entre os frames.
+        Cada interface é pré-construída uma única vez, as liberadas depois são construídas no uso.
+        Retorna falso quando a fila está vazia.
+        '''
+
+        while len(self.prebuild_queue) > 0:
+
+            state = self.prebuild_queue.pop(0)
+
+            with self.lock:
+
+                if state in self.interfaces:
+
+                    continue
+
+                self.interfaces[state] = self.build_interface(state)
+                self.interfaces.move_to_end(state, last=False)  # Ainda não foi usada
+
+            return True
+
+        return False
+
+    def release_interfaces(self, keep_state=None):
+        '''
+        Libera as interfaces usadas há mais tempo até que a memória ocupada caiba no limite. Sem
+        limite libera todas. A interface do estado mantido nunca é liberada.
+        '''
+
+        with self.lock:
+
+            for state in list(self.interfaces):
+
+                if self.memory_budget is not None and self.get_memory_usage() <= self.memory_budget:
+
+                    break
+
+                if state != keep_state:
+
+                    del self.interfaces[state]
+
+    def get_memory_usage(self):
+        '''
+        Retorna a memória ocupada pelas superfícies das interfaces construídas.
+        '''
+
+        return sum(interface.get_memory_usage() for interface in self.interfaces.values())
+
     def update(self, state, display, events, modification_data, score, life):
         '''
         Atualiza os eventos e gráficos da interface.
         '''
 
+        self.handle_events(state, events)
+        self.render(state, display, modification_data, score, life)
+
+    def handle_events(self, state, events):
+        '''
+        Obtém o evento dos botões da interface do estado. Apenas a geometria dos botões é lida, então
+        pode ser chamado enquanto a thread de renderização desenha a interface.
+        '''
+
         self.user_interface_event = None  # Redefine o evento
 
-        # Atualiza os eventos com base no estado. Em geral a interface é atualizada, os eventos dos
-        # botões são obtidos e é feita a renderização
+        interface = self.get_interface(state)
 
-        if state == State.MAIN_MENU:
+        if interface is None:
 
-            for event in events:
+            return
 
-                self.user_interface_event = self.main_menu.check_buttons(event)
+        for event in events:
 
-            self.main_menu.render(display)
-        elif state == State.MODIFICATION_MENU:
+            self.user_interface_event = interface.check_buttons(event)
+
+    def render(self, state, display, modification_data, score, life):
+        '''
+        Atualiza os elementos e renderiza a interface do estado. A interface inteira é desenhada
+        quando o estado muda ou quando o display não mantém o conteúdo, caso contrário apenas as
+        regiões alteradas. Com um limite de memória as interfaces de outros estados são liberadas
+        quando o limite é passado.
+        '''
+
+        self.dirty_rects = None  # Por padrão a tela inteira é atualizada
 
-            self.modification_menu.update(modification_data)
+        full_redraw = not self.retained_display or state != self.previous_state
+        self.previous_state = state
 
-            for event in events:
+        interface = self.get_interface(state)
 
-                self.user_interface_event = self.modification_menu.check_buttons(event)
+        if interface is None:
 
-            self.modification_menu.render(display)
+            return
+
+        if state == State.MODIFICATION_MENU:
+
+            interface.update(modification_data)
         elif state == State.GAMEPLAY:
 
-            self.gameplay_interface.update(score, life)
+            interface.update({"Score": score, "Life": life})
+        elif state == State.GAMEOVER:
 
-            for event in events:
+            interface.update({"Score": score, "Points": score // 500})
 
-                self.user_interface_event = self.gameplay_interface.check_buttons(event)
+        # A interface do gameplay fica sobre o jogo e altera apenas as regiões dos elementos
+        self.dirty_rects = interface.render(display, full_redraw)
 
-            self.gameplay_interface.render(display)
-        elif state == State.PAUSE:
+        if self.memory_budget is not None and self.get_memory_usage() > self.memory_budget:
 
-            for event in events:
+            self.release_interfaces(state)
 
-                self.user_interface_event = self.pause_interface.check_buttons(event)
+    def invalidate(self):
+        '''
+        Faz a interface ser desenhada inteira no próximo frame.
+        '''
 
-            self.pause_interface.render(display)
-        elif state == State.GAMEOVER:
+        self.previous_state = None
+
+    def resize(self, screen_size):
+        '''
+        Reposiciona as interfaces construídas para um novo tamanho de tela. As fontes, textos
+        renderizados e sprites são mantidos, apenas as posições e as superfícies compostas mudam.
+        '''
+
+        with self.lock:
+
+            self.screen_size = screen_size
 
-            self.gameover_interface.update(score, score // 500)
+            for interface in self.interfaces.values():
 
-            for event in events:
+                interface.relayout(screen_size)
 
-                self.user_interface_event = self.gameover_interface.check_buttons(event)
+        self.invalidate()
 
-            self.gameover_interface.render(display)
+    def set_display_retention(self, retained_display):
+        '''
+        Define se o display mantém o conteúdo entre os frames. Sem isso a interface é desenhada
+        inteira a cada frame.
+        '''
+
+        self.retained_display = retained_display
 
     def get_event(self):
         '''
@@ -99,6 +252,14 @@ class UserInterfaceManager():
 
         return self.user_interface_event
 
+    def get_dirty_rects(self):
+        '''
+        Retorna as regiões alteradas pela interface no último frame. Retorna None caso a tela
+        inteira tenha sido alterada.
+        '''
+
+        return self.dirty_rects
+
     def play_sound(self):
         '''
         Toca o som da interface.
@@ -124,6 +285,49 @@ class Alignment(Enum):
     BOTTOM = 9
 
 
+class DataBinding():
+
+    '''
+    Liga os elementos da interface a valores dos dados. Cada elemento é atualizado apenas quando o
+    valor ligado muda.
+    '''
+
+    bindings: dict  # Elementos e formatações ligados a cada chave
+    values: dict  # Último valor de cada chave
+
+    def __init__(self):
+
+        self.bindings = {}
+        self.values = {}
+
+    def bind(self, key, element, formatter=None):
+        '''
+        Liga um elemento a uma chave. A formatação converte o valor antes da atualização.
+        '''
+
+        self.bindings.setdefault(key, []).append((element, formatter))
+        self.values.pop(key, None)  # O novo elemento recebe o valor na próxima atualização
+
+    def update(self, data):
+        '''
+        Atualiza os elementos das chaves cujo valor mudou.
+        '''
+
+        for key, elements in self.bindings.items():
+
+            value = data[key]
+
+            if key in self.values and self.values[key] == value:
+
+                continue
+
+            self.values[key] = value
+
+            for element, formatter in elements:
+
+                element.update(value if formatter is None else formatter(value))
+
+
 class UserInterface():
 
     '''
@@ -138,6 +342,10 @@ class UserInterface():
     surface: pygame.Surface  # Superfície e renderização
     background: None  # Plano de fundo
     background_color: pygame.color.Color  # Cor do plano de fundo
+    overlay: bool  # Define se a interface é transparente e fica sobre o gameplay
+    panels: dict  # Retângulo e superfície de cada painel da interface transparente, por alinhamento
+    binding: DataBinding  # Ligação dos elementos aos dados
+    composed: bool  # Define se a superfície já foi composta
 
     def __init__(self, position, size, screen_size, background_color):
 
@@ -146,34 +354,216 @@ class UserInterface():
         self.texts = {}
         self.buttons = {}
         self.bars = {}
-        self.surface = pygame.Surface(size, pygame.SRCALPHA)
         self.background = None
         self.background_color = pygame.color.Color(background_color)
+        self.overlay = self.background_color.a < 255
+        self.binding = DataBinding()
+        self.composed = False
+
+        self.panels = {}
+
+        # As telas com fundo opaco não precisam de transparência por pixel. A interface transparente
+        # não tem uma superfície do tamanho da tela, apenas os painéis em volta dos elementos
+        if not self.overlay:
+
+            self.surface = pygame.Surface(size).convert()
+        else:
+
+            self.surface = None
+
+    def update(self, data):
+        '''
+        Atualiza os elementos ligados aos dados.
+        '''
+
+        self.binding.update(data)
+
+    def relayout(self, screen_size):
+        '''
+        Recalcula as posições dos elementos para um novo tamanho de tela. A interface é composta
+        novamente no próximo frame.
+        '''
+
+        self.screen_size = screen_size
+
+        for element in self.get_elements():
+
+            element.relayout(screen_size)
+
+        if self.background is not None:
+
+            self.background.relayout(screen_size)
+
+        # A superfície opaca tem o tamanho da tela, os painéis são recriados na composição
+        if not self.overlay and self.surface.get_size() != tuple(screen_size):
+
+            self.surface = pygame.Surface(screen_size).convert()
+
+        self.panels = {}
+        self.composed = False
+
+    def build_panels(self):
+        '''
+        Cria os painéis da interface transparente. Os elementos com o mesmo alinhamento ficam no
+        mesmo painel, que tem o tamanho do retângulo que os envolve.
+        '''
+
+        self.panels = {}
+
+        for element in self.get_elements():
+
+            rect = element.get_rect()
+
+            if element.alignment in self.panels:
+
+                rect = rect.union(self.panels[element.alignment][0])
+
+            self.panels[element.alignment] = (rect, None)
+
+        for alignment, (rect, _) in self.panels.items():
+
+            self.panels[alignment] = (rect, pygame.Surface(rect.size, pygame.SRCALPHA))
+
+    def get_elements(self):
+        '''
+        Retorna os elementos na ordem de desenho.
+        '''
 
-    def render(self, display):
+        return list(self.buttons.values()) + list(self.bars.values()) + list(self.texts.values())
+
+    def compose(self, surface, offset=(0, 0)):
         '''
-        Renderiza a interface.
+        Desenha todos os elementos em uma superfície posicionada no deslocamento. Respeita o recorte
+        da superfície, assim pode recompor apenas uma região.
         '''
 
-        self.surface.fill(self.background_color)  # Preenche o fundo
+        surface.fill(self.background_color)  # Preenche o fundo
 
         if self.background is not None:  # Renderiza o plano de fundo se tiver
 
-            self.background.sprites.draw(self.surface)
+            surface.blits([(sprite.image, sprite.rect.move(-offset[0], -offset[1]))
+                           for sprite in self.background.sprites],
+                          doreturn=False)
 
         for key in self.buttons:  # Renderiza os botões
 
-            self.buttons[key].render(self.surface)
+            self.buttons[key].render(surface, offset)
 
         for key in self.bars:  # Renderiza as barras
 
-            self.bars[key].render(self.surface)
+            self.bars[key].render(surface, offset)
 
         for key in self.texts:  # Renderiza os textos
 
-            self.surface.blit(self.texts[key].get_render(), self.texts[key].get_position())
+            position = self.texts[key].get_position()
+            surface.blit(self.texts[key].get_render(), (position[0] - offset[0],
+                                                        position[1] - offset[1]))
+
+    def get_surfaces(self):
+        '''
+        Retorna as superfícies da interface com os seus retângulos.
+        '''
+
+        if self.overlay:
+
+            return list(self.panels.values())
+
+        return [(self.surface.get_rect(), self.surface)]
+
+    def get_memory_usage(self):
+        '''
+        Retorna a memória ocupada pelas superfícies da interface.
+        '''
+
+        return sum(SurfaceCache.get_surface_memory(surface) for _, surface in self.get_surfaces())
+
+    def recompose(self):
+        '''
+        Recompõe as regiões dos elementos alterados. Retorna as regiões recompostas.
+        '''
+
+        elements = list(self.bars.values()) + list(self.texts.values())  # Os botões não mudam
+
+        if not self.composed:  # A primeira composição desenha as superfícies inteiras
+
+            if self.overlay:
+
+                self.build_panels()
+
+            for rect, surface in self.get_surfaces():
+
+                self.compose(surface, rect.topleft)
+
+            self.composed = True
+
+            for element in elements:
+
+                element.set_dirty(False)
+
+            return [rect for rect, _ in self.get_surfaces()]
+
+        rects = []
+
+        for element in elements:
+
+            if element.is_dirty():
+
+                rects.append(element.get_rect())
+                element.set_dirty(False)
+
+        # Os elementos sobrepostos são redesenhados na ordem, mas apenas dentro de cada região
+        for rect, surface in self.get_surfaces():
+
+            for dirty_rect in rects:
+
+                if rect.colliderect(dirty_rect):
+
+                    surface.set_clip(dirty_rect.move(-rect.x, -rect.y))
+                    self.compose(surface, rect.topleft)
+
+            surface.set_clip(None)
+
+        return rects
+
+    def render(self, display, full_redraw=True):
+        '''
+        Renderiza a interface. As superfícies compostas são mantidas entre os frames e apenas os
+        elementos alterados são recompostos. Sem o redesenho completo só as regiões recompostas são
+        desenhadas no display. A interface transparente fica sobre o gameplay, que é redesenhado a
+        cada frame, então os seus painéis são desenhados inteiros. Retorna as regiões alteradas do
+        display. None indica a superfície inteira.
+        '''
+
+        rects = self.recompose()
+
+        if len(rects) > 0:
+
+            for _, surface in self.get_surfaces():
+
+                TextureCanvas.touch(surface)  # Informa que o conteúdo da superfície mudou
+
+        if self.overlay:
+
+            rects = [rect.move(self.position) for rect, _ in self.panels.values()]
+
+            display.blits([(surface, rect.move(self.position))
+                           for rect, surface in self.panels.values()],
+                          doreturn=False)
+
+            return rects
+
+        if full_redraw:
+
+            display.blit(self.surface, self.position)  # Renderiza a superfície no display
+            return None
 
-        display.blit(self.surface, self.position)  # Renderiza a superfície no display
+        rects = [rect.move(self.position) for rect in rects]
+
+        display.blits([(self.surface, rect, rect.move(-self.position[0], -self.position[1]))
+                       for rect in rects],
+                      doreturn=False)
+
+        return rects
 
     def check_buttons(self, event):
         '''
@@ -198,6 +588,8 @@ class Button():
     Define um botão.
     '''
 
+    alignment: Alignment  # Alinhamento
+    relative_position: tuple  # Posição em relação ao alinhamento
     position: tuple  # Posição
     size: tuple  # Tamanho
     event: Event  # Evento
@@ -214,6 +606,8 @@ class Button():
                  background,
                  foreground):
 
+        self.alignment = alignment
+        self.relative_position = position
         self.size = size
         self.event = event
         self.key = key
@@ -266,12 +660,262 @@ class Button():
 
         return self.event
 
-    def render(self, surface):
+    def relayout(self, screen_size):
+        '''
+        Recalcula a posição para um novo tamanho de tela.
+        '''
+
+        self.position = UserInterfaceUtillities.calculate_position(self.alignment,
+                                                                   self.relative_position,
+                                                                   self.size,
+                                                                   screen_size)
+
+        foreground, background = self.sprites.sprites()
+        foreground.update(self.position)
+        background.update((self.position[0] + 10, self.position[1] + 10))
+
+    def get_rect(self):
+        '''
+        Retorna o retângulo do botão.
+        '''
+
+        return self.sprites.sprites()[0].rect.copy()
+
+    def render(self, surface, offset=(0, 0)):
+        '''
+        Renderiza o botão em uma superfície posicionada no deslocamento.
+        '''
+
+        surface.blits([(sprite.image, sprite.rect.move(-offset[0], -offset[1]))
+                       for sprite in self.sprites],
+                      doreturn=False)
+
+
+class FontRegistry():
+
+    '''
+    Registro de fontes compartilhadas. Cada combinação de arquivo e tamanho é carregada do disco
+    uma única vez e usada por todos os textos. O acesso é protegido por uma trava, pois a thread de
+    renderização também renderiza textos.
+    '''
+
+    default_face: str  # Arquivo da fonte padrão
+    lock: Lock  # Trava de acesso
+    fonts: dict  # Fontes por arquivo e tamanho
+    bitmap_fonts: dict  # Fontes de bitmap por fonte e cores
+    loads: int  # Fontes carregadas do disco
+    hits: int  # Acessos a fontes já carregadas
+
+    def __init__(self, default_face):
+
+        self.default_face = default_face
+        self.lock = Lock()
+        self.fonts = {}
+        self.bitmap_fonts = {}
+        self.loads = 0
+        self.hits = 0
+
+    def get_font(self, size, face=None):
+        '''
+        Retorna a fonte do arquivo e tamanho. Sem o arquivo usa a fonte padrão.
+        '''
+
+        key = (face or self.default_face, size)
+
+        with self.lock:
+
+            font = self.fonts.get(key)
+
+            if font is not None:
+
+                self.hits += 1
+            else:
+
+                self.loads += 1
+                font = pygame.font.Font(*key)
+                self.fonts[key] = font
+
+        return font
+
+    def get_bitmap_font(self, size, color, shadow_color=None, face=None):
+        '''
+        Retorna a fonte de bitmap do arquivo, tamanho e cores. O atlas é criado no primeiro acesso.
+        '''
+
+        font = self.get_font(size, face)
+        key = (font, tuple(color), None if shadow_color is None else tuple(shadow_color))
+
+        with self.lock:
+
+            bitmap_font = self.bitmap_fonts.get(key)
+
+            if bitmap_font is None:
+
+                bitmap_font = BitmapFont(font, color, shadow_color, size // 8)
+                self.bitmap_fonts[key] = bitmap_font
+
+        return bitmap_font
+
+    def preload(self, sizes, face=None):
+        '''
+        Carrega os tamanhos de uma fonte antes do uso.
+        '''
+
+        for size in sizes:
+
+            self.get_font(size, face)
+
+    def get_statistics(self):
         '''
-        Renderiza o botão
+        Retorna as estatísticas do registro.
         '''
 
-        self.sprites.draw(surface)
+        with self.lock:
+
+            return {"Fonts": len(self.fonts), "Loads": self.loads, "Hits": self.hits}
+
+
+class BitmapFont():
+
+    '''
+    Fonte de bitmap. Os caracteres e as suas sombras são renderizados uma única vez em um atlas e os
+    textos são montados com o desenho de partes do atlas, sem o uso do FreeType. A correção de
+    espaçamento entre pares de caracteres (kerning) é obtida da fonte e guardada para cada par.
+    '''
+
+    # Caracteres pré-renderizados no atlas
+    characters: str = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ :.,-+/%"
+
+    font: pygame.font.Font  # Fonte
+    color: pygame.color.Color  # Cor
+    shadow_color: pygame.color.Color  # Cor da sombra. None sem sombra
+    shadow_offset: int  # Deslocamento horizontal da sombra
+    atlas: pygame.Surface  # Caracteres na primeira linha e sombras na segunda
+    glyphs: dict  # Caractere, sombra e avanço de cada caractere
+    kerning: dict  # Correção do avanço de cada par de caracteres
+
+    def __init__(self, font, color, shadow_color=None, shadow_offset=0):
+
+        self.font = font
+        self.color = pygame.color.Color(color)
+        self.shadow_color = None if shadow_color is None else pygame.color.Color(shadow_color)
+        self.shadow_offset = shadow_offset
+        self.glyphs = {}
+        self.kerning = {}
+
+        height = self.font.get_height()
+        width = sum(self.font.size(character)[0] for character in self.characters)
+
+        self.atlas = pygame.Surface((width, height * 2), pygame.SRCALPHA)
+
+        x = 0
+
+        for character in self.characters:
+
+            advance = self.font.size(character)[0]
+            glyph = self.font.render(character, False, self.color)
+            self.atlas.blit(glyph, (x, 0))
+
+            shadow = None
+
+            if self.shadow_color is not None:
+
+                self.atlas.blit(self.font.render(character, False, self.shadow_color), (x, height))
+                shadow = self.atlas.subsurface((x, height, glyph.get_width(), height))
+
+            self.glyphs[character] = (self.atlas.subsurface((x, 0, glyph.get_width(), height)),
+                                      shadow,
+                                      advance)
+
+            x += advance
+
+    def get_glyph(self, character):
+        '''
+        Retorna o caractere, a sua sombra e o avanço. Caracteres fora do atlas são renderizados no
+        primeiro uso.
+        '''
+
+        glyph = self.glyphs.get(character)
+
+        if glyph is None:
+
+            shadow = None
+
+            if self.shadow_color is not None:
+
+                shadow = self.font.render(character, False, self.shadow_color)
+
+            glyph = (self.font.render(character, False, self.color),
+                     shadow,
+                     self.font.size(character)[0])
+
+            self.glyphs[character] = glyph
+
+        return glyph
+
+    def get_kerning(self, pair):
+        '''
+        Retorna a correção do avanço entre dois caracteres. É a diferença entre a largura do par
+        renderizado junto e a soma dos avanços de cada caractere.
+        '''
+
+        kerning = self.kerning.get(pair)
+
+        if kerning is None:
+
+            advances = self.get_glyph(pair[0])[2] + self.get_glyph(pair[1])[2]
+            kerning = self.font.size(pair)[0] - advances
+            self.kerning[pair] = kerning
+
+        return kerning
+
+    def get_positions(self, text):
+        '''
+        Retorna a posição horizontal de cada caractere e a largura do texto.
+        '''
+
+        positions = []
+        x = 0
+
+        for i, character in enumerate(text):
+
+            if i > 0:
+
+                x += self.get_kerning(text[i - 1:i + 1])
+
+            positions.append(x)
+            x += self.get_glyph(character)[2]
+
+        return positions, x
+
+    def size(self, text):
+        '''
+        Retorna o tamanho do texto.
+        '''
+
+        return (self.get_positions(text)[1], self.font.get_height())
+
+    def render(self, text, surface):
+        '''
+        Desenha o texto em uma superfície transparente. As sombras são desenhadas antes dos
+        caracteres, como no texto renderizado de uma vez.
+        '''
+
+        glyphs = []
+        shadows = []
+
+        for character, x in zip(text, self.get_positions(text)[0]):
+
+            glyph, shadow, _ = self.get_glyph(character)
+            glyphs.append((glyph, (x, 0)))
+
+            if shadow is not None:
+
+                shadows.append((shadow, (x + self.shadow_offset, 0)))
+
+        surface.fill((0, 0, 0, 0))  # Limpa a superfície
+        surface.blits(shadows, doreturn=False)
+        surface.blits(glyphs, doreturn=False)
 
 
 class Text():
@@ -280,15 +924,25 @@ class Text():
     Define o texto.
     '''
 
+    # Fontes compartilhadas pelos textos
+    font_registry: FontRegistry = FontRegistry(join("assets", "fonts", "joystix monospace.ttf"))
+
+    # Textos renderizados, compartilhados entre os textos iguais
+    render_cache: SurfaceCache = SurfaceCache(2 * 1024 * 1024)
+
+    alignment: Alignment  # Alinhamento
     size: int  # Tamanho
+    relative_position: tuple  # Posição em relação ao alinhamento
     position: tuple  # Posição
     font: pygame.font.Font  # Fonte
-    text: pygame.font.Font.render  # Superfície renderizada do texto
+    bitmap_font: BitmapFont  # Fonte de bitmap. None quando o texto é renderizado pelo FreeType
+    string: str  # Texto atual
+    render_size: tuple  # Tamanho da superfície, definido pelo texto inicial
     color: pygame.color.Color  # Cor
     has_shadow: bool  # Define se o texto tem sombra
     shadow_color: pygame.color.Color  # Cor da sombra
-    shadow_text: pygame.font.Font.render  # Superfície renderizada do texto de sombra
     merged_surface: pygame.Surface  # Superfície unida
+    dirty: bool  # Define se o texto mudou desde a última composição
 
     def __init__(self,
                  text,
@@ -298,49 +952,93 @@ class Text():
                  color,
                  screen_size,
                  shadow,
-                 shadow_color=None):
+                 shadow_color=None,
+                 bitmap=False):
 
+        self.alignment = alignment
         self.size = size
+        self.relative_position = position
         self.color = pygame.color.Color(color)
-        self.font = pygame.font.Font(join("assets", "fonts", "joystix monospace.ttf"), self.size)
-        self.text = self.font.render(text, False, self.color)
+        self.font = self.font_registry.get_font(self.size)
+        self.bitmap_font = None
+        self.string = None
+        self.render_size = self.font.size(text)
         self.has_shadow = shadow
         self.shadow_color = None
 
-        self.merged_surface = pygame.Surface((self.text.get_rect().width,
-                                              self.text.get_rect().height),
-                                             pygame.SRCALPHA)
-
-        if self.has_shadow:  # Se tem sombra cria o texto de sombra e o renderiza
+        if self.has_shadow:
 
             self.shadow_color = pygame.color.Color(shadow_color)
-            self.shadow_text = self.font.render(text, False, self.shadow_color)
-            self.merged_surface.blit(self.shadow_text, (self.size // 8, 0))
 
-        self.merged_surface.blit(self.text, (0, 0))  # Renderiza o texto
+        # Com a fonte de bitmap o texto tem a sua própria superfície, redesenhada a cada mudança
+        if bitmap:
+
+            self.bitmap_font = self.font_registry.get_bitmap_font(self.size,
+                                                                  self.color,
+                                                                  self.shadow_color)
+            self.merged_surface = pygame.Surface(self.render_size, pygame.SRCALPHA)
+
+        self.update(text)  # Renderiza o texto
 
         # Obtém a posição calculada com o alinhamento
         self.position = UserInterfaceUtillities.calculate_position(alignment,
                                                                    position,
-                                                                   (self.text.get_rect().width,
-                                                                    self.text.get_rect().height),
+                                                                   self.render_size,
                                                                    screen_size)
 
     def update(self, text):
         '''
-        Atualiza o texto.
+        Atualiza o texto. Não faz nada quando o texto não mudou. Sem a fonte de bitmap a superfície
+        renderizada vem do cache e não deve ser modificada.
         '''
 
-        self.merged_surface.fill((0, 0, 0, 0))  # Limpa a superfície
+        if text == self.string:
+
+            return
+
+        self.string = text
+        self.dirty = True
 
-        self.text = self.font.render(text, False, self.color)  # Renderiza o texto
+        if self.bitmap_font is not None:
+
+            self.bitmap_font.render(text, self.merged_surface)
+            return
+
+        key = (self.font,
+               text,
+               tuple(self.color),
+               tuple(self.shadow_color) if self.has_shadow else None,
+               self.render_size)
+
+        self.merged_surface = self.render_cache.get_surface(key, self.render)
+
+    def render(self):
+        '''
+        Renderiza o texto atual e a sua sombra em uma nova superfície.
+        '''
+
+        merged_surface = pygame.Surface(self.render_size, pygame.SRCALPHA)
 
         if self.has_shadow:  # Se tem sombra renderiza o texto de sombra
 
-            self.shadow_text = self.font.render(text, False, self.shadow_color)
-            self.merged_surface.blit(self.shadow_text, (self.size // 8, 0))
+            shadow_text = self.font.render(self.string, False, self.shadow_color)
+            merged_surface.blit(shadow_text, (self.size // 8, 0))
+
+        # Renderiza o texto na superfície
+        merged_surface.blit(self.font.render(self.string, False, self.color), (0, 0))
+
+        return merged_surface
 
-        self.merged_surface.blit(self.text, (0, 0))  # Renderiza o texto na superfície
+    def relayout(self, screen_size):
+        '''
+        Recalcula a posição para um novo tamanho de tela. O texto não é renderizado novamente.
+        '''
+
+        self.position = UserInterfaceUtillities.calculate_position(self.alignment,
+                                                                   self.relative_position,
+                                                                   self.render_size,
+                                                                   screen_size)
+        self.dirty = True
 
     def get_render(self):
         '''
@@ -356,6 +1054,27 @@ class Text():
 
         return self.position
 
+    def get_rect(self):
+        '''
+        Retorna o retângulo do texto.
+        '''
+
+        return pygame.Rect(self.position, self.render_size)
+
+    def is_dirty(self):
+        '''
+        Retorna verdadeiro caso o texto tenha mudado desde a última composição.
+        '''
+
+        return self.dirty
+
+    def set_dirty(self, dirty):
+        '''
+        Define se o texto deve ser recomposto.
+        '''
+
+        self.dirty = dirty
+
 
 class Background():
 
@@ -374,6 +1093,15 @@ class Background():
                                       (1024, 1024),
                                       image))
 
+    def relayout(self, screen_size):
+        '''
+        Centraliza o plano de fundo em um novo tamanho de tela.
+        '''
+
+        for sprite in self.sprites:
+
+            sprite.update((screen_size[0] / 2 - 512, screen_size[1] / 2 - 512))
+
 
 class Bar():
 
@@ -381,17 +1109,27 @@ class Bar():
     Define uma barra.
     '''
 
+    alignment: Alignment  # Alinhamento
+    relative_position: tuple  # Posição em relação ao alinhamento
     position: tuple  # Posição
     internal_bar_position: tuple  # Posição da barra interna
     size: tuple  # Tamanho
     internal_bar_size: tuple  # Tamanho da barra interna
-    sprites: pygame.sprite.RenderPlain  # Sprites
+    border_color: pygame.color.Color  # Cor da borda
+    color: pygame.color.Color  # Cor da barra interna
+    value: int  # Largura atual da barra interna
+    dirty: bool  # Define se a barra mudou desde a última composição
 
     def __init__(self, alignment, position, size, border_color, color, screen_size):
 
+        self.alignment = alignment
+        self.relative_position = position
         self.size = size
         self.internal_bar_size = (size[0] - 10, size[1] - 10)
-        self.sprites = pygame.sprite.RenderPlain()
+        self.border_color = pygame.color.Color(border_color)
+        self.color = pygame.color.Color(color)
+        self.value = self.internal_bar_size[0]
+        self.dirty = True
 
         # Obtém a posição calculada com o alinhamento
         self.position = UserInterfaceUtillities.calculate_position(alignment,
@@ -402,13 +1140,6 @@ class Bar():
         self.internal_bar_position = (self.position[0] + 5,
                                       self.position[1] + 5)
 
-        self.sprites.add(CustomSprite(self.position,
-                                      self.size,
-                                      color=border_color))
-        self.sprites.add(CustomSprite(self.internal_bar_position,
-                                      self.internal_bar_size,
-                                      color=color))
-
     def update(self, value):
         '''
         Atualiza o tamanho da barra com base em um valor de 0 a 100.
@@ -420,15 +1151,59 @@ class Bar():
 
             new_value = 1
 
-        self.sprites.sprites()[1].update(self.internal_bar_position,
-                                         (new_value, self.internal_bar_size[1]))
+        if new_value == self.value:  # O tamanho não mudou
+
+            return
+
+        self.value = new_value
+        self.dirty = True
+
+    def relayout(self, screen_size):
+        '''
+        Recalcula a posição para um novo tamanho de tela.
+        '''
+
+        self.position = UserInterfaceUtillities.calculate_position(self.alignment,
+                                                                   self.relative_position,
+                                                                   self.size,
+                                                                   screen_size)
+
+        self.internal_bar_position = (self.position[0] + 5,
+                                      self.position[1] + 5)
+        self.dirty = True
+
+    def get_rect(self):
+        '''
+        Retorna o retângulo da barra.
+        '''
+
+        return pygame.Rect(self.position, self.size)
+
+    def is_dirty(self):
+        '''
+        Retorna verdadeiro caso a barra tenha mudado desde a última composição.
+        '''
+
+        return self.dirty
 
-    def render(self, surface):
+    def set_dirty(self, dirty):
         '''
-        Renderiza a barra.
+        Define se a barra deve ser recomposta.
         '''
 
-        self.sprites.draw(surface)
+        self.dirty = dirty
+
+    def render(self, surface, offset=(0, 0)):
+        '''
+        Renderiza a barra em uma superfície posicionada no deslocamento. A borda e a barra interna
+        são retângulos preenchidos, sem imagens escaladas.
+        '''
+
+        internal_bar_rect = pygame.Rect(self.internal_bar_position,
+                                        (self.value, self.internal_bar_size[1]))
+
+        surface.fill(self.border_color, self.get_rect().move(-offset[0], -offset[1]))
+        surface.fill(self.color, internal_bar_rect.move(-offset[0], -offset[1]))
 
 
 class UserInterfaceUtillities():
@@ -912,12 +1687,23 @@ class ModificationMenu(UserInterface):
                                               screen_size,
                                               False)
 
-    def update(self, modification_data):
+        # Liga os números e as barras aos dados de modificação
+        self.binding.bind("Modification Points", self.texts["Point Number"], str)
+
+        for modifier in ("Velocity", "Damage", "Firerate", "Armor"):
+
+            self.binding.bind(modifier, self.texts[f"{modifier} Number"], str)
+            self.binding.bind(modifier, self.bars[modifier])
+
+        self.binding.bind("Bullet Type", self.texts["Bullet Type Number"], self.format_bullet_type)
+        self.binding.bind("Bullet Type", self.bars["Bullet Type"])
+
+    @staticmethod
+    def format_bullet_type(bullet_type_number):
         '''
-        Atualiza os dados dos componentes da interface.
+        Retorna o texto do tipo de bala.
         '''
 
-        bullet_type_number = modification_data["Bullet Type"]
         bullet_type = f"{bullet_type_number}: "
 
         # Definição do texto do tipo de bala
@@ -934,18 +1720,7 @@ class ModificationMenu(UserInterface):
 
             bullet_type += "TRIPLO AVANÇADO"
 
-        # Atualiza os elementos da interface
-        self.texts["Point Number"].update(str(modification_data["Modification Points"]))
-        self.texts["Velocity Number"].update(str(modification_data["Velocity"]))
-        self.bars["Velocity"].update(modification_data["Velocity"])
-        self.texts["Damage Number"].update(str(modification_data["Damage"]))
-        self.bars["Damage"].update(modification_data["Damage"])
-        self.texts["Firerate Number"].update(str(modification_data["Firerate"]))
-        self.bars["Firerate"].update(modification_data["Firerate"])
-        self.texts["Armor Number"].update(str(modification_data["Armor"]))
-        self.bars["Armor"].update(modification_data["Armor"])
-        self.texts["Bullet Type Number"].update(bullet_type)
-        self.bars["Bullet Type"].update(bullet_type_number)
+        return bullet_type
 
 
 class GameplayInterface(UserInterface):
@@ -967,13 +1742,15 @@ class GameplayInterface(UserInterface):
                                 (100, 0, 0),
                                 screen_size)
 
+        # Os contadores mudam com frequência e são montados com a fonte de bitmap
         self.texts["Life"] = Text("XXX",
                                   Alignment.BOTTOM_LEFT,
                                   (185, 35),
                                   30,
                                   (230, 230, 230),
                                   screen_size,
-                                  False)
+                                  False,
+                                  bitmap=True)
 
         self.texts["Score"] = Text("SCORE: ",
                                    Alignment.BOTTOM_LEFT,
@@ -991,7 +1768,8 @@ class GameplayInterface(UserInterface):
                                           (230, 230, 230),
                                           screen_size,
                                           True,
-                                          (130, 130, 130))
+                                          (130, 130, 130),
+                                          bitmap=True)
 
         self.buttons["Pause"] = Button(Alignment.BOTTOM_RIGHT,
                                        (125, 25),
@@ -1010,14 +1788,10 @@ class GameplayInterface(UserInterface):
                                    screen_size,
                                    False)
 
-    def update(self, score, life):
-        '''
-        Atualiza a interface de gameplay.
-        '''
-
-        self.texts["Score Number"].update(f"{score:07}")
-        self.bars["Life"].update(life)
-        self.texts["Life"].update(str(life))
+        # Liga os contadores à pontuação e à vida
+        self.binding.bind("Score", self.texts["Score Number"], lambda score: f"{score:07}")
+        self.binding.bind("Life", self.bars["Life"])
+        self.binding.bind("Life", self.texts["Life"], str)
 
 
 class PauseInterface(UserInterface):
@@ -1186,10 +1960,6 @@ class GameoverInterface(UserInterface):
                                   screen_size,
                                   False)
 
-    def update(self, score, points):
-        '''
-        Atualiza a interface de gameplay.
-        '''
-
-        self.texts["Score Number"].update(f"{score:07}")
-        self.texts["Point Number"].update(str(points))
+        # Liga os números à pontuação e aos pontos ganhos
+        self.binding.bind("Score", self.texts["Score Number"], lambda score: f"{score:07}")
+        self.binding.bind("Points", self.texts["Point Number"], str)
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+'''
+Módulo para as ondas de inimigos em formação.
+'''
+
+from enum import Enum
+from random import choice, randint
+from math import sqrt
+
+
+class Formation(Enum):
+
+    '''
+    Formações das ondas.
+    '''
+
+    V_SHAPE = 1
+    COLUMN = 2
+    SWEEP = 3
+
+
+class FlightPath():
+
+    '''
+    Trajetória de voo. Os pontos de controle definem uma spline de Catmull-Rom que é amostrada
+    em uma tabela no carregamento. Os pontos da tabela têm uma distância constante entre si, assim
+    o parâmetro do caminho avança de forma proporcional à velocidade da aeronave.
+    '''
+
+    points: list  # Tabela de posições
+    spacing: float  # Distância entre os pontos da tabela
+
+    def __init__(self, control_points, spacing=2.0, subdivisions=32):
+
+        self.spacing = spacing
+        self.points = []
+
+        # Os pontos das extremidades são duplicados para que a curva passe por todos os pontos
+        control_points = [control_points[0]] + list(control_points) + [control_points[-1]]
+
+        dense_points = []
+
+        # Amostra densamente cada segmento da spline
+        for i in range(1, len(control_points) - 2):
+
+            for j in range(subdivisions):
+
+                dense_points.append(self.catmull_rom(control_points[i - 1],
+                                                     control_points[i],
+                                                     control_points[i + 1],
+                                                     control_points[i + 2],
+                                                     j / subdivisions))
+
+        dense_points.append(tuple(control_points[-2]))
+
+        # Reamostra a curva com base no comprimento do arco
+        self.points.append(dense_points[0])
+        distance = 0.0  # Distância percorrida desde o último ponto da tabela
+
+        for i in range(1, len(dense_points)):
+
+            start = dense_points[i - 1]
+            end = dense_points[i]
+            segment = sqrt((end[0] - start[0])**2 + (end[1] - start[1])**2)
+
+            while distance + segment >= self.spacing:
+
+                # Interpola o ponto dentro do segmento
+                ratio = (self.spacing - distance) / segment
+                start = (start[0] + (end[0] - start[0]) * ratio,
+                         start[1] + (end[1] - start[1]) * ratio)
+                segment -= self.spacing - distance
+                distance = 0.0
+
+                self.points.append(start)
+
+            distance += segment
+
+    @staticmethod
+    def catmull_rom(point_0, point_1, point_2, point_3, t):
+        '''
+        Calcula um ponto da spline de Catmull-Rom entre os pontos 1 e 2.
+        '''
+
+        t_2 = t * t
+        t_3 = t_2 * t
+
+        return tuple(0.5 * (2.0 * point_1[k] +
+                            (-point_0[k] + point_2[k]) * t +
+                            (2.0 * point_0[k] - 5.0 * point_1[k] + 4.0 * point_2[k] - point_3[k]) * t_2 +
+                            (-point_0[k] + 3.0 * point_1[k] - 3.0 * point_2[k] + point_3[k]) * t_3)
+                     for k in range(2))
+
+    def get_point(self, parameter):
+        '''
+        Retorna a posição da tabela no parâmetro. Parâmetros negativos retornam o início do caminho.
+        '''
+
+        index = int(parameter)
+
+        if index < 0:
+
+            index = 0
+        elif index >= len(self.points):
+
+            index = len(self.points) - 1
+
+        return self.points[index]
+
+    def get_length(self):
+        '''
+        Retorna a quantidade de pontos da tabela.
+        '''
+
+        return len(self.points)
+
+    def get_spacing(self):
+        '''
+        Retorna a distância entre os pontos da tabela.
+        '''
+
+        return self.spacing
+
+
+class WaveFactory():
+
+    '''
+    Fábrica de ondas. Gera grupos de inimigos que seguem trajetórias pré-calculadas. As trajetórias
+    são criadas no carregamento e apenas recriadas quando o tamanho da tela muda.
+    '''
+
+    screen_size: tuple  # Tamanho da tela
+    interval: float  # Tempo entre as ondas
+    next_wave_time: float  # Tempo da próxima onda
+    steering: bool  # Define se os inimigos das ondas também usam a direção reativa
+    enemy_factory: None  # Fábrica de inimigos
+    paths: dict  # Trajetórias por formação
+
+    def __init__(self, screen_size, interval, enemy_factory, steering=False):
+
+        self.screen_size = screen_size
+        self.interval = interval
+        self.next_wave_time = interval
+        self.steering = steering
+        self.enemy_factory = enemy_factory
+        self.paths = {}
+
+        self.build_paths()
+
+    def build_paths(self):
+        '''
+        Cria as trajetórias para o tamanho da tela.
+        '''
+
+        width = self.screen_size[0]
+        height = self.screen_size[1]
+
+        # As trajetórias de mergulho são relativas à posição inicial da onda. A de varredura é
+        # absoluta e atravessa a tela de um lado para o outro
+        self.paths = {Formation.V_SHAPE: FlightPath(((0, 0),
+                                                     (0, height * 0.4),
+                                                     (width * 0.1, height * 0.7),
+                                                     (0, height + 900))),
+                      Formation.COLUMN: FlightPath(((0, 0),
+                                                    (width * 0.15, height * 0.35),
+                                                    (-width * 0.15, height * 0.7),
+                                                    (0, height + 900))),
+                      Formation.SWEEP: FlightPath(((-300, height * 0.1),
+                                                   (width * 0.3, height * 0.3),
+                                                   (width * 0.7, height * 0.3),
+                                                   (width + 300, height * 0.1)))}
+
+    def set_screen_size(self, screen_size):
+        '''
+        Define o tamanho da tela e recria as trajetórias. As ondas já geradas mantêm as trajetórias
+        antigas até saírem da tela.
+        '''
+
+        self.screen_size = screen_size
+        self.build_paths()
+
+    def reset(self):
+        '''
+        Redefine o tempo da próxima onda.
+        '''
+
+        self.next_wave_time = self.interval
+
+    def is_ready(self, elapsed_time):
+        '''
+        Retorna verdadeiro caso seja o momento de gerar uma onda.
+        '''
+
+        return elapsed_time >= self.next_wave_time
+
+    def generate_wave(self, elapsed_time, available_slots):
+        '''
+        Gera uma onda de inimigos e a retorna. A onda é limitada pela quantidade de vagas.
+        '''
+
+        self.next_wave_time = elapsed_time + self.interval
+
+        formation = choice(list(Formation))
+        wave = []
+
+        # Define a posição de cada membro como (âncora, parâmetro inicial)
+        members = []
+
+        if formation == Formation.V_SHAPE:
+
+            anchor_x = randint(self.screen_size[0] // 4, 3 * self.screen_size[0] // 4)
+
+            # O líder fica na frente e os alas ficam para trás, um de cada lado
+            for i in range(5):
+
+                rank = (i + 1) // 2
+                side = -1 if i % 2 == 1 else 1
+
+                members.append(((anchor_x + side * rank * 250, -300 - rank * 200), 0.0))
+        elif formation == Formation.COLUMN:
+
+            anchor_x = randint(self.screen_size[0] // 4, 3 * self.screen_size[0] // 4)
+
+            # Os membros seguem a mesma trajetória, separados no parâmetro
+            for i in range(4):
+
+                members.append(((anchor_x, -300), -i * 150.0))
+        else:
+
+            for i in range(4):
+
+                members.append(((0, 0), -i * 150.0))
+
+        path = self.paths[formation]
+
+        for anchor, start_parameter in members[:max(available_slots, 0)]:
+
+            position = (anchor[0] + path.get_point(0)[0], anchor[1] + path.get_point(0)[1])
+            enemy = self.enemy_factory.generate_enemy(elapsed_time, position)
+
+            if enemy is not None:
+
+                enemy.set_path(path, anchor, start_parameter, self.steering)
+                wave.append(enemy)
+
+        return wave